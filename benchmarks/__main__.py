@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Runs the scenarios of the benchmark suite, each in a fresh child process, and
+reports their wall time and peak resident memory.
+
+    python -m benchmarks [--quick] [-k pattern] [--repeat N]
+                         [--json results.json] [--compare baseline.json]
+
+The results written with ``--json`` can be given to ``--compare`` by a later
+run to print the ratio of the times and memories of the scenarios.
+"""
+
+import sys
+import json
+import platform
+import argparse
+
+import reportlab
+
+from benchmarks.suite import get_scenarios
+from benchmarks.utils import measure
+
+
+def run(scenario, repeat):
+    durations, peaks = zip(*[measure(scenario.fn, *scenario.args) for x in range(repeat)])
+    return {'name': scenario.name, 'time': min(durations), 'peak_rss': max(peaks)}
+
+
+def format_result(result, baseline=None):
+    line = '{0:<40} {1:>10.3f}s {2:>10.1f}MB'.format(result['name'], result['time'], result['peak_rss'] / 1024.)
+    if baseline is not None:
+        line += ' {0:>8.2f}x {1:>8.2f}x'.format(result['time'] / baseline['time'],
+                                                result['peak_rss'] / float(baseline['peak_rss']))
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='run smaller scenarios')
+    parser.add_argument('-k', dest='pattern', default='', help='run the scenarios whose name contains PATTERN')
+    parser.add_argument('--repeat', type=int, default=1, help='keep the best time of REPEAT runs')
+    parser.add_argument('--json', help='write the results in JSON')
+    parser.add_argument('--compare', help='compare with the results of a previous run written in JSON')
+    args = parser.parse_args(argv)
+
+    baselines = {}
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baselines = dict((result['name'], result) for result in json.load(baseline_file)['results'])
+
+    results = []
+    for scenario in get_scenarios(args.quick):
+        if args.pattern not in scenario.name:
+            continue
+        result = run(scenario, args.repeat)
+        results.append(result)
+        print(format_result(result, baselines.get(result['name'])))
+        sys.stdout.flush()
+
+    if args.json:
+        with open(args.json, 'w') as out:
+            json.dump({
+                'python': platform.python_version(),
+                'reportlab': reportlab.Version,
+                'platform': platform.platform(),
+                'results': results,
+            }, out, indent=2)
+
+
+if __name__ == '__main__':
+    main()
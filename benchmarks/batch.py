@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Throughput of render_many against a serial loop of Story.build.
+
+    python -m benchmarks.batch [documents] [workers]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import multiprocessing
+
+from pdf_generator import Story, SimpleTemplate, Paragraph
+from pdf_generator.batch import RenderJob, render_many
+
+
+def invoice():
+    flowables = [Paragraph(u'Invoice', 'h1')]
+    for x in range(80):
+        flowables.append(u'Item {0}: {1:.2f}'.format(x, x * 1.2))
+    return flowables
+
+
+def serial(template, paths):
+    for path in paths:
+        story = Story(template)
+        story.extend(invoice())
+        with open(path, 'wb') as out:
+            story.build(out, u'Invoice', u'PDF Generator')
+
+
+def batch(template, paths, workers):
+    jobs = [RenderJob(template, invoice, path, u'Invoice', u'PDF Generator') for path in paths]
+    for result in render_many(jobs, workers=workers):
+        if result.error:
+            raise RuntimeError(result.error)
+
+
+def main(documents=200, workers=None):
+    workers = workers or multiprocessing.cpu_count()
+    template = SimpleTemplate()
+    directory = tempfile.mkdtemp()
+    try:
+        paths = [os.path.join(directory, '{0}.pdf'.format(x)) for x in range(documents)]
+        for name, fn, args in [
+                ('serial', serial, (template, paths)),
+                ('render_many, {0} workers'.format(workers), batch, (template, paths, workers)),
+        ]:
+            start = time.time()
+            fn(*args)
+            duration = time.time() - start
+            print('{0:<40} {1:>10.3f}s {2:>10.1f} doc/s'.format(name, duration, documents / duration))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Build of a big story in one process against a build by chunks.
+
+    python -m benchmarks.chunks [sections] [workers]
+"""
+
+import io
+import sys
+import time
+import multiprocessing
+
+from reportlab.lib import units
+
+from pdf_generator import Story, SimpleTemplate, Paragraph
+from pdf_generator.page_number import NumberedCanvasFactory
+
+
+def get_story(sections):
+    story = Story(SimpleTemplate())
+    for x in range(sections):
+        story.append(Paragraph(u'Section {0}'.format(x), 'h1'))
+        for y in range(100):
+            story.append(u'Paragraph {0} of the section {1}'.format(y, x))
+        story.next_page()
+    return story
+
+
+def main(sections=100, workers=None):
+    workers = workers or multiprocessing.cpu_count()
+    for name, kw in [
+            ('single process', {}),
+            ('chunks, {0} workers'.format(workers), {'workers': workers}),
+    ]:
+        story = get_story(sections)
+        start = time.time()
+        story.build(io.BytesIO(), u'Report', u'PDF Generator',
+                    canvasmaker=NumberedCanvasFactory(-1 * units.cm, 1.5 * units.cm), **kw)
+        duration = time.time() - start
+        print('{0:<40} {1:>10.3f}s'.format(name, duration))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Layout of tables whose column widths are computed by reportlab on all the
+rows or frozen on a sample by TableGenerator.freeze_column_widths.
+
+    python -m benchmarks.column_widths [rows ...]
+"""
+
+import sys
+
+from pdf_generator.table import TableGenerator
+from benchmarks.utils import measure, report
+
+
+def get_generator(count):
+    gen = TableGenerator()
+    gen.append([u'Name', u'Value', u'Label', u'Date', u'Comment'])
+    for x in range(count):
+        gen.append([u'Row {0}'.format(x), u'{0:.2f}'.format(x * 1.3), u'Label {0}'.format(x % 17),
+                    u'2020-01-{0:02}'.format(x % 28 + 1), u'Comment on the row {0}'.format(x)])
+    return gen
+
+
+def layout(gen, freeze):
+    if freeze:
+        gen.freeze_column_widths(sample=200)
+    gen.get_table().wrap(1000, 1000)
+
+
+def main(*counts):
+    for count in counts or (1000, 5000, 20000):
+        gen = get_generator(count)
+        report('{0} rows, all measured'.format(count), *measure(layout, gen, False))
+        report('{0} rows, frozen on a sample'.format(count), *measure(layout, gen, True))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
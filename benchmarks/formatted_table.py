@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Formatting of numeric cells by FormattedTableGenerator, row by row with
+append, with extend and by columns with extend_columns.
+
+    python -m benchmarks.formatted_table [rows]
+"""
+
+import sys
+import time
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pdf_generator.table import FormattedTableGenerator
+
+FORMATS = [None, '.2f', '.0%', ',d']
+
+
+def get_columns(count):
+    return [
+        [u'Row {0}'.format(x) for x in range(count)],
+        array.array('d', (x * 1.3 for x in range(count))),
+        array.array('d', (x / float(count) for x in range(count))),
+        array.array('l', range(count)),
+    ]
+
+
+def append(columns):
+    gen = FormattedTableGenerator(FORMATS)
+    for row in zip(*columns):
+        gen.append(row)
+
+
+def extend(columns):
+    FormattedTableGenerator(FORMATS).extend(zip(*columns))
+
+
+def extend_columns(columns):
+    FormattedTableGenerator(FORMATS).extend_columns(columns)
+
+
+def main(count=250000):
+    columns = get_columns(count)
+    scenarios = [('append', append, columns),
+                 ('extend', extend, columns),
+                 ('extend_columns', extend_columns, columns)]
+    if numpy is not None:
+        scenarios.append(('extend_columns, numpy', extend_columns,
+                          columns[:1] + [numpy.array(column) for column in columns[1:]]))
+
+    for name, fn, args in scenarios:
+        start = time.time()
+        fn(args)
+        duration = time.time() - start
+        print('{0:<40} {1:>10.3f}s {2:>10.0f} cells/s'.format(name, duration, count * len(FORMATS) / duration))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
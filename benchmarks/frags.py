@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Creation of the repeated cells of a report, with and without a FragsCache.
+
+    python -m benchmarks.frags [rows]
+"""
+
+import sys
+import time
+
+from pdf_generator.styles import FragsCache, Paragraph, bold
+
+
+def create(rows):
+    cells = []
+    for x in range(rows):
+        cells.append([bold(u'Total'), Paragraph(u'N/A'), Paragraph(u'<i>EUR</i>'),
+                      Paragraph(u'{0:.2f}'.format(x * 1.3))])
+    return cells
+
+
+def main(rows=20000):
+    start = time.time()
+    create(rows)
+    print('{0:<40} {1:>10.3f}s'.format('no cache', time.time() - start))
+
+    cache = FragsCache()
+    start = time.time()
+    with cache:
+        create(rows)
+    print('{0:<40} {1:>10.3f}s {2:>10.1%} hits'.format('FragsCache', time.time() - start, cache.hit_rate))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Rendering of a long html article, parsed at once by html_to_rlab in a table
+or in a flat list, or read by chunks by iter_html_flowables.
+
+    python -m benchmarks.from_html [sections]
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+from pdf_generator import Story, SimpleTemplate
+from pdf_generator.from_html import html_to_rlab, iter_html_flowables
+from benchmarks.utils import measure, report
+
+
+def get_html(sections):
+    parts = []
+    for x in range(sections):
+        parts.append(u'<h2>Section {0}</h2>'.format(x))
+        for y in range(10):
+            parts.append(u'<p>Paragraph {0} with <strong>some</strong> <em>markup</em> and '
+                         u'<a href="/page/{0}">a link</a> in a longer text.</p>'.format(y))
+        parts.append(u'<ul><li>First item</li><li>Second item</li></ul>')
+    return u''.join(parts)
+
+
+def build(path, mode):
+    story = Story(SimpleTemplate())
+    with io.open(path, encoding='utf-8') as html:
+        if mode == 'streaming':
+            story.extend(iter_html_flowables(html))
+        elif mode == 'flat':
+            story.extend(html_to_rlab(html.read(), flat=True))
+        else:
+            story.append(html_to_rlab(html.read()))
+    story.build(io.BytesIO(), u'Article', u'PDF Generator')
+
+
+def main(sections=500):
+    fd, path = tempfile.mkstemp(suffix='.html')
+    try:
+        with io.open(fd, 'w', encoding='utf-8') as html:
+            html.write(get_html(sections))
+        report('html_to_rlab', *measure(build, path, 'table'))
+        report('html_to_rlab, flat', *measure(build, path, 'flat'))
+        report('iter_html_flowables', *measure(build, path, 'streaming'))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Conversion of the same html snippet many times, with and without a
+HTMLCache, and with a FragsCache for the markup of the paragraphs.
+
+    python -m benchmarks.html_cache [conversions]
+"""
+
+import sys
+import time
+
+from pdf_generator.from_html import HTMLCache, html_to_rlab
+from pdf_generator.styles import FragsCache
+
+SNIPPET = u''.join(
+    u'<p>Article {0}: the <strong>terms</strong> of <em>sale</em> and the '
+    u'<a href="/legal">legal notice</a> apply to the orders.</p>'.format(x)
+    for x in range(20)
+)
+
+
+def main(conversions=2000):
+    cache = HTMLCache()
+    for name, kw in [('no cache', {}), ('HTMLCache', {'cache': cache})]:
+        start = time.time()
+        for x in range(conversions):
+            html_to_rlab(SNIPPET, flat=True, **kw)
+        print('{0:<40} {1:>10.3f}s'.format(name, time.time() - start))
+
+    start = time.time()
+    with FragsCache():
+        for x in range(conversions):
+            html_to_rlab(SNIPPET, flat=True, cache=cache)
+    print('{0:<40} {1:>10.3f}s'.format('HTMLCache and FragsCache', time.time() - start))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Conversion of many html fragments one after the other and with the parsing
+in a pool of processes.
+
+    python -m benchmarks.html_many [fragments] [workers]
+"""
+
+import sys
+import time
+import multiprocessing
+
+from pdf_generator.from_html import html_to_rlab, html_to_rlab_many
+
+
+def get_fragments(count):
+    return [u'<h3>Product {0}</h3><p>The <strong>product {0}</strong> is '
+            u'<em>available</em> in {1} colors.</p><ul><li>Size S</li><li>Size M</li></ul>'.format(x, x % 7)
+            for x in range(count)]
+
+
+def main(count=2000, workers=None):
+    workers = workers or multiprocessing.cpu_count()
+    fragments = get_fragments(count)
+    for name, fn in [
+            ('html_to_rlab', lambda: [html_to_rlab(text, flat=True) for text in fragments]),
+            ('html_to_rlab_many, {0} workers'.format(workers),
+             lambda: html_to_rlab_many(fragments, flat=True, workers=workers)),
+    ]:
+        start = time.time()
+        fn()
+        print('{0:<40} {1:>10.3f}s'.format(name, time.time() - start))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Parsing of tag-heavy html by the parser of html_to_rlab, without the layout.
+Each input is parsed *repeat* times, the best time is reported.
+
+    python -m benchmarks.html_parser [size] [repeat]
+"""
+
+import sys
+import timeit
+
+from pdf_generator.from_html import html_to_rlab
+
+
+def inline_markup(size):
+    # Long paragraphs made almost only of inline tags
+    words = u''.join(u'<strong>w{0}</strong> <em>x</em> <font color="red">y</font><br/>'.format(x)
+                     for x in range(50))
+    return u''.join(u'<p>{0}</p>'.format(words) for x in range(size // 50))
+
+
+def unknown_tags(size):
+    # Tags without rules, copied as they are in the paragraphs
+    words = u''.join(u'<b>a</b><i>b</i><u>c</u><sub>d</sub>' for x in range(50))
+    return u''.join(u'<p>{0}</p>'.format(words) for x in range(size // 50))
+
+
+def short_blocks(size):
+    # Many small blocks, each cleaning the buffer
+    return u''.join(u'<h3>Title {0}</h3><p>Text <a href="/{0}">{0}</a></p><ul><li>a</li><li>b</li></ul>'.format(x)
+                    for x in range(size))
+
+
+def nested_lists(size):
+    item = u'<li>Item <strong>bold</strong></li>'
+    return u''.join(u'<blockquote><ul>{0}<li><ul>{0}{0}</ul></li></ul></blockquote>'.format(item)
+                    for x in range(size // 4))
+
+
+def main(size=2000, repeat=5):
+    for fn in [inline_markup, unknown_tags, short_blocks, nested_lists]:
+        html = fn(size)
+        duration = min(timeit.repeat(lambda: html_to_rlab(html, flat=True), number=1, repeat=repeat))
+        print('{0:<40} {1:>10.3f}s'.format(fn.__name__, duration))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Layout of a catalogue of images without a given size, the size being read
+by reportlab from the image or from its header by styles.Image.
+
+    python -m benchmarks.image_size [images]
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+from PIL import Image as PILImage
+from reportlab.platypus import Image as BaseImage
+
+from pdf_generator.styles import Image
+from benchmarks.utils import measure, report
+
+
+def layout(directory, count, image_class):
+    images = [image_class(os.path.join(directory, '{0}.png'.format(x % 50))) for x in range(count)]
+    for image in images:
+        image.wrap(500, 800)
+
+
+def main(count=1000):
+    directory = tempfile.mkdtemp()
+    try:
+        for x in range(50):
+            PILImage.effect_noise((600, 400), 64 + x).save(os.path.join(directory, '{0}.png'.format(x)))
+        report('reportlab Image', *measure(layout, directory, count, BaseImage))
+        report('styles.Image', *measure(layout, directory, count, Image))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Rendering of a document drawing the same large image many times, read from
+its file each time or from an ImageCache.
+
+    python -m benchmarks.images [count]
+"""
+
+import io
+import os
+import sys
+import shutil
+import tempfile
+
+from PIL import Image as PILImage
+
+from pdf_generator import Story, SimpleTemplate
+from pdf_generator.styles import Image
+from pdf_generator.medias import ImageCache
+from benchmarks.utils import measure, report
+
+
+def build(path, count, cached):
+    cache = ImageCache() if cached else None
+    story = Story(SimpleTemplate())
+    for x in range(count):
+        story.append(Image(path, 150, 75, cache=cache))
+    out = io.BytesIO()
+    story.build(out, u'Images', u'PDF Generator')
+    print('{0:<40} {1:>10.1f}kB'.format('output', len(out.getvalue()) / 1024.))
+
+
+def main(count=100):
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'photo.png')
+        PILImage.effect_mandelbrot((2400, 1200), (-2, -1, 1, 1), 100).convert('RGB').save(path)
+        report('Image', *measure(build, path, count, False))
+        report('Image, ImageCache', *measure(build, path, count, True))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Rebuild of a story of 300 pages after the edition of a paragraph,
+laid out again entirely or incrementally.
+
+    python -m benchmarks.incremental [chapters]
+"""
+
+import io
+import sys
+import time
+
+from pdf_generator import Story, SimpleTemplate, Paragraph
+
+TEXT = (u'The <b>supplier</b> delivers the goods described in the <i>order</i> within the delays '
+        u'agreed with the customer, paragraph {0} of chapter {1}.')
+
+
+def get_story(chapters):
+    story = Story(SimpleTemplate())
+    for chapter in range(chapters):
+        story.append(Paragraph(u'Chapter {0}'.format(chapter), 'h1'))
+        for x in range(150):
+            story.append(TEXT.format(x, chapter))
+        story.next_page()
+    return story
+
+
+def edit(story, count):
+    story[len(story) // 2 + count] = Paragraph(u'Edited ' + TEXT.format(count, 'edited') * 2)
+
+
+def main(chapters=60, edits=5):
+    # A story is consumed by a full build, it is made again for each edit
+    start = time.time()
+    for count in range(edits):
+        story = get_story(chapters)
+        for previous in range(count + 1):
+            edit(story, previous)
+        story.build(io.BytesIO(), u'Report', u'PDF Generator')
+    print('{0:<40} {1:>10.3f}s'.format('full rebuild', (time.time() - start) / edits))
+
+    story = get_story(chapters)
+    story.build(io.BytesIO(), u'Report', u'PDF Generator', incremental=True)
+    start = time.time()
+    for count in range(edits):
+        edit(story, count)
+        story.build(io.BytesIO(), u'Report', u'PDF Generator', incremental=True)
+    print('{0:<40} {1:>10.3f}s'.format('incremental rebuild', (time.time() - start) / edits))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Rendering of many invoices differing by a few fields, with the lines of the
+paragraphs broken at each build or shared by a LayoutCache.
+
+    python -m benchmarks.layout_cache [documents]
+"""
+
+import io
+import sys
+import time
+
+from pdf_generator import Story, SimpleTemplate
+from pdf_generator.styles import LayoutCache
+
+TERMS = u' '.join(u'Article {0}: the <b>supplier</b> delivers the goods described in the '
+                  u'<i>order</i> within the delays agreed with the customer.'.format(x) for x in range(8))
+
+
+def build(customer, cache):
+    story = Story(SimpleTemplate())
+    story.append(u'Invoice for customer {0}'.format(customer), 'h1')
+    for x in range(40):
+        story.append(u'<b>Product {0}</b>: a description of the product on a single line'.format(x))
+    for x in range(30):
+        story.append(TERMS)
+    story.build(io.BytesIO(), u'Invoice', u'PDF Generator', layout_cache=cache)
+
+
+def main(count=20):
+    for name, cache in [('without cache', None), ('LayoutCache', LayoutCache())]:
+        start = time.time()
+        for customer in range(count):
+            build(customer, cache)
+        hit_rate = u' hit rate {0:.2f}'.format(cache.hit_rate) if cache else u''
+        print('{0:<40} {1:>10.3f}s{2}'.format(name, time.time() - start, hit_rate))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
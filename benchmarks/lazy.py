@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Peak memory of a big story prepared before its build, with paragraphs parsed
+when they are created or when they are laid out.
+
+    python -m benchmarks.lazy [paragraphs]
+"""
+
+import io
+import sys
+
+from pdf_generator import Story, SimpleTemplate
+from benchmarks.utils import measure, report
+
+
+def build(paragraphs, lazy):
+    story = Story(SimpleTemplate())
+    for x in range(paragraphs):
+        story.append(u'Paragraph <b>{0}</b> with <i>some</i> markup and a longer text to fill a line'.format(x),
+                     lazy=lazy)
+    story.build(io.BytesIO(), u'Report', u'PDF Generator')
+
+
+def main(paragraphs=50000):
+    report('Paragraph', *measure(build, paragraphs, False))
+    report('LazyParagraph', *measure(build, paragraphs, True))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Time and peak memory of the page numbering of long documents, built at once
+or streamed by segments of pages.
+
+    python -m benchmarks.page_number [pages]
+"""
+
+import io
+import sys
+
+from pdf_generator import Story, SimpleTemplate
+from pdf_generator.page_number import NumberedCanvasFactory
+
+from benchmarks.utils import measure, report
+
+
+def build(pages, streaming):
+    story = Story(SimpleTemplate())
+    for x in range(pages * 60):
+        story.append(u'Line {0} of the statement'.format(x))
+
+    story.build(io.BytesIO(), u'Benchmark', u'PDF Generator', streaming=streaming,
+                canvasmaker=NumberedCanvasFactory(-20, 20))
+
+
+def main(pages=2000):
+    report('{0} pages'.format(pages), *measure(build, pages, False))
+    report('{0} pages, streaming'.format(pages), *measure(build, pages, True))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Rendering of an html document with many images read from a store with a
+latency, one after the other or prefetched by a PrefetchMediasLocator.
+
+    python -m benchmarks.prefetch [images] [latency in ms]
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import functools
+import tempfile
+
+from PIL import Image as PILImage
+
+from pdf_generator import Story, SimpleTemplate
+from pdf_generator.from_html import html_to_rlab
+from pdf_generator.medias import PathMediasLocator, PrefetchMediasLocator, read_file
+from benchmarks.utils import measure, report
+
+
+def slow_read(latency, path):
+    # A stand-in for a network store
+    time.sleep(latency)
+    return read_file(path)
+
+
+class ReadingMediasLocator(object):
+    def __init__(self, locator, fetch):
+        self.locator = locator
+        self.fetch = fetch
+
+    def __call__(self, path):
+        return io.BytesIO(self.fetch(self.locator(path)))
+
+
+def build(directory, count, latency, prefetch):
+    fetch = functools.partial(slow_read, latency / 1000.)
+    if prefetch:
+        locator = PrefetchMediasLocator(PathMediasLocator(directory), workers=8, fetch=fetch)
+    else:
+        locator = ReadingMediasLocator(PathMediasLocator(directory), fetch)
+
+    html = u''.join(u'<p>Image {0}</p><img src="/{0}.png" width="100" height="50" />'.format(x)
+                    for x in range(count))
+    story = Story(SimpleTemplate())
+    story.extend(html_to_rlab(html, locator, flat=True))
+    story.build(io.BytesIO(), u'Images', u'PDF Generator')
+
+
+def main(count=100, latency=20):
+    directory = tempfile.mkdtemp()
+    try:
+        for x in range(count):
+            PILImage.new('RGB', (200, 100), (x, 0, 0)).save(os.path.join(directory, '{0}.png'.format(x)))
+        report('read on use', *measure(build, directory, count, latency, False))
+        report('PrefetchMediasLocator, 8 threads', *measure(build, directory, count, latency, True))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
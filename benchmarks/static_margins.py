@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Rendering of a long document of short pages with a header and a footer
+drawn on each page or once in a form XObject.
+
+    python -m benchmarks.static_margins [pages]
+"""
+
+import io
+import sys
+
+from reportlab.lib import colors
+from reportlab.platypus import PageBreak
+
+from pdf_generator import Story, SimpleTemplate, Paragraph
+from benchmarks.utils import measure, report
+
+
+def build(pages, static_margins):
+    template = SimpleTemplate(
+        header=Paragraph(u'<b>ACME Corporation</b> - Annual report - <i>Confidential</i>',
+                         borderColor=colors.grey),
+        footer=Paragraph(u'ACME Corporation, 1 Main Street, Springfield - www.example.com',
+                         fontSize=8, borderColor=colors.grey),
+        static_margins=static_margins,
+    )
+    story = Story(template)
+    for x in range(pages):
+        story.append(u'Page {0}'.format(x))
+        story.append(PageBreak())
+    out = io.BytesIO()
+    story.build(out, u'Report', u'PDF Generator')
+    print('{0:<40} {1:>10.1f}kB'.format('output', len(out.getvalue()) / 1024.))
+
+
+def main(pages=2000):
+    report('header and footer on each page', *measure(build, pages, False))
+    report('static_margins', *measure(build, pages, True))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Time and peak memory of the build of a long report of charts and of a long
+statement of paragraphs numbered with the total of pages, written at the end
+of the build or streamed by segments of pages.
+
+    python -m benchmarks.streaming [pages]
+"""
+
+import sys
+import tempfile
+
+from reportlab.platypus import Flowable
+
+from pdf_generator import Story, SimpleTemplate
+from pdf_generator.page_number import NumberedCanvasFactory
+
+from benchmarks.utils import measure, report
+
+
+class Chart(Flowable):
+    """
+    A small flowable drawing a large page, as a chart of many points.
+    """
+    def __init__(self, index, points=2000):
+        Flowable.__init__(self)
+        self.index = index
+        self.points = points
+        self.width = 500
+        self.height = 600
+
+    def draw(self):
+        path = self.canv.beginPath()
+        path.moveTo(0, 0)
+        for x in range(self.points):
+            path.lineTo(x * self.width / self.points, (x * 7919 + self.index) % 997 * self.height / 997.)
+        self.canv.drawPath(path)
+
+
+def build(pages, streaming):
+    story = Story(SimpleTemplate())
+    for x in range(pages):
+        story.append(Chart(x))
+
+    with tempfile.TemporaryFile() as out:
+        story.build(out, u'Benchmark', u'PDF Generator', streaming=streaming)
+
+
+def build_numbered(pages, streaming):
+    story = Story(SimpleTemplate())
+    for x in range(pages * 60):
+        story.append(u'Line {0} of the statement'.format(x))
+
+    with tempfile.TemporaryFile() as out:
+        story.build(out, u'Benchmark', u'PDF Generator', streaming=streaming,
+                    canvasmaker=NumberedCanvasFactory(-20, 20))
+
+
+def main(pages=2000):
+    report('{0} pages'.format(pages), *measure(build, pages, False))
+    report('{0} pages, streaming'.format(pages), *measure(build, pages, True))
+    report('{0} pages numbered'.format(pages), *measure(build_numbered, pages, False))
+    report('{0} pages numbered, streaming'.format(pages), *measure(build_numbered, pages, True))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
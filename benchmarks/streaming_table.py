@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Build of a long table as a LongTable of all the rows and as a StreamingTable.
+
+    python -m benchmarks.streaming_table [rows]
+"""
+
+import io
+import sys
+
+from pdf_generator import Story, SimpleTemplate
+from pdf_generator.table import TableGenerator, styles
+from benchmarks.utils import measure, report
+
+
+def rows(count):
+    for x in range(count):
+        yield [u'Row {0}'.format(x), u'{0:.2f}'.format(x * 1.3), u'Label {0}'.format(x % 17)]
+
+
+def build(count, streaming):
+    gen = TableGenerator()
+    gen.append([u'Name', u'Value', u'Label'])
+    if streaming:
+        table = gen.get_streaming_table(rows(count), styles.grid, chunk_size=500)
+    else:
+        gen.extend(rows(count))
+        table = gen.get_long_table(styles.grid, repeatRows=1)
+
+    story = Story(SimpleTemplate())
+    story.append(table)
+    story.build(io.BytesIO(), u'Export', u'PDF Generator')
+
+
+def main(count=20000):
+    report('LongTable', *measure(build, count, False))
+    report('StreamingTable', *measure(build, count, True))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Bulk creation of paragraphs with style overrides, with and without the shared
+styles of pdf_generator.styles.get_style.
+
+    python -m benchmarks.styles [paragraphs]
+"""
+
+import sys
+
+from reportlab.lib import colors
+
+from pdf_generator import styles
+from pdf_generator.styles import Paragraph
+from benchmarks.utils import measure, report
+
+
+def create(paragraphs, maxsize):
+    styles.style_cache.maxsize = maxsize
+    rows = []
+    for x in range(paragraphs):
+        rows.append(Paragraph(u'Row {0}'.format(x), 'BodyText',
+                              fontSize=8, textColor=colors.red if x % 2 else colors.black))
+    return len(rows)
+
+
+def main(paragraphs=50000):
+    report('new style per paragraph', *measure(create, paragraphs, 0))
+    report('shared styles', *measure(create, paragraphs, 512))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Scenarios of the benchmark suite run by ``python -m benchmarks``.
+
+Each scenario builds its input from fixed data, without randomness nor
+network, and renders it in memory.
+"""
+
+import io
+import collections
+
+from reportlab.lib import units
+
+from pdf_generator import Story, SimpleTemplate, Paragraph
+from pdf_generator.templates import Template, TemplateRows
+from pdf_generator.table import TableGenerator, styles
+from pdf_generator.from_html import html_to_rlab
+from pdf_generator.page_number import NumberedCanvasFactory
+
+Scenario = collections.namedtuple('Scenario', [
+    'name',
+    'fn',
+    'args',
+])
+
+TEXT = (u'The <b>supplier</b> delivers the goods described in the <i>order</i> within the delays '
+        u'agreed with the customer, paragraph {0}.')
+
+# The paragraphs of a page of the SimpleTemplate
+LINES = 60
+
+
+def story_pages(pages):
+    story = Story(SimpleTemplate())
+    for x in range(pages * LINES):
+        story.append(TEXT.format(x))
+    story.build(io.BytesIO(), u'Benchmark', u'PDF Generator')
+
+
+def long_table(rows):
+    gen = TableGenerator()
+    gen.append([u'Name', u'Value', u'Label'])
+    gen.extend([u'Row {0}'.format(x), u'{0:.2f}'.format(x * 1.3), u'Label {0}'.format(x % 17)]
+               for x in range(rows))
+
+    story = Story(SimpleTemplate())
+    story.append(gen.get_long_table(styles.grid, repeatRows=1))
+    story.build(io.BytesIO(), u'Benchmark', u'PDF Generator')
+
+
+def get_html(sections):
+    return u''.join(
+        u'<h1>Section {0}</h1>'
+        u'<p>Text of the <strong>section</strong> {0} with a <a href="/link/{0}">link</a>.</p>'
+        u'<ul><li>First item</li><li>Second <em>item</em></li></ul>'
+        u'<center><p>Centered text</p></center>'.format(x) for x in range(sections))
+
+
+def html(sections):
+    html_to_rlab(get_html(sections))
+
+
+def numbered_canvas(pages, streaming):
+    story = Story(SimpleTemplate())
+    for x in range(pages * LINES):
+        story.append(u'Line {0} of the statement'.format(x))
+    story.build(io.BytesIO(), u'Benchmark', u'PDF Generator', streaming=streaming,
+                canvasmaker=NumberedCanvasFactory(-20, 20))
+
+
+def multi_frame_template(pages):
+    template = Template(margins=1 * units.cm,
+                        header=Paragraph(u'Header'), footer=Paragraph(u'Footer'))
+    rows = TemplateRows()
+    rows.row(4 * units.cm).split(2)
+    rows.row(2 * units.cm)
+    rows.row().split(3)
+    template.add_page('columns', rows)
+
+    story = Story(template)
+    for x in range(pages * 40):
+        story.append(TEXT.format(x))
+    story.build(io.BytesIO(), u'Benchmark', u'PDF Generator')
+
+
+def get_scenarios(quick=False):
+    """
+    Returns the list of :class:`Scenario`, smaller ones when *quick*.
+    """
+    pages = [10, 100] if quick else [10, 100, 1000]
+    rows = [1000] if quick else [1000, 10000, 100000]
+    sections = [100] if quick else [100, 10000]
+    long_pages = 100 if quick else 2000
+
+    scenarios = []
+    for count in pages:
+        scenarios.append(Scenario('story {0} pages'.format(count), story_pages, (count, )))
+    for count in rows:
+        scenarios.append(Scenario('long table {0} rows'.format(count), long_table, (count, )))
+    for count in sections:
+        scenarios.append(Scenario('html_to_rlab {0} sections'.format(count), html, (count, )))
+    scenarios.append(Scenario('numbered canvas {0} pages'.format(long_pages), numbered_canvas, (long_pages, False)))
+    scenarios.append(Scenario('numbered canvas {0} pages streaming'.format(long_pages),
+                              numbered_canvas, (long_pages, True)))
+    for count in pages:
+        scenarios.append(Scenario('multi-frame template {0} pages'.format(count), multi_frame_template, (count, )))
+    return scenarios
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Per document setup cost of the templates with a header and a footer: the
+creation of the doc template alone, then the build of single page documents.
+
+    python -m benchmarks.templates [documents]
+"""
+
+import io
+import sys
+import timeit
+
+from pdf_generator import Story, SimpleTemplate, Paragraph
+from pdf_generator.templates import Template
+
+
+def get_templates():
+    kw = dict(header=Paragraph(u'Invoice'), footer=Paragraph(u'Company, address'))
+    template = Template(**kw)
+    template.add_whole_page('first')
+    template.add_page('next', [(0, 0, .5, None), (.5, 0, .5, None)])
+    return [('SimpleTemplate', SimpleTemplate(**kw)), ('Template', template)]
+
+
+def build(template):
+    story = Story(template)
+    story.append(Paragraph(u'Hello'))
+    story.build(io.BytesIO(), u'Invoice', u'PDF Generator')
+
+
+def main(count=2000):
+    for name, template in get_templates():
+        setup = min(timeit.repeat(lambda: template(io.BytesIO(), u'Invoice', u'PDF Generator'),
+                                  number=count * 10, repeat=3)) / (count * 10)
+        document = min(timeit.repeat(lambda: build(template), number=count // 10, repeat=3)) / (count // 10)
+        print('{0:<40} {1:>10.1f}us {2:>10.1f}us'.format(name, setup * 1e6, document * 1e6))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
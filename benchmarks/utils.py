@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark helpers
+=================
+
+Each measure runs in a fresh child process so that the peak resident memory
+of a scenario is not polluted by the previous ones.
+"""
+
+import time
+import resource
+import multiprocessing
+
+
+def _run(fn, args):
+    start = time.time()
+    fn(*args)
+    duration = time.time() - start
+    return duration, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(fn, *args):
+    """
+    Runs *fn* with *args* in a child process and returns the wall time in
+    seconds and the peak resident memory in kilobytes.
+    """
+    pool = multiprocessing.Pool(1)
+    try:
+        return pool.apply(_run, (fn, args))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def report(name, duration, peak_rss):
+    print('{0:<40} {1:>10.3f}s {2:>10.1f}MB'.format(name, duration, peak_rss / 1024.))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Batch rendering
+===============
+
+:func:`render_many` renders many documents with a pool of processes. Each
+:class:`RenderJob` gives the template, a callable returning the flowables of
+the document, the path of the output and the meta datas of the document.
+
+The templates are sent once to each worker process, the flowables factories
+are sent with each job. Both must be picklable: a template with a header
+or a footer is picklable as long as its paragraph and its *page_end* are. The
+factories are usually module level functions or :func:`functools.partial` of
+them.
+
+>>> def invoice(customer):
+...     return [Paragraph(customer.name, 'h1'), ...]
+>>> template = SimpleTemplate()
+>>> jobs = [RenderJob(template, functools.partial(invoice, customer),
+...                   'invoice-{0}.pdf'.format(customer.id), 'Invoice', 'Enix')
+...         for customer in customers]
+>>> for result in render_many(jobs, workers=4):
+...     if result.error:
+...         print(result.out, result.error)
+
+The paragraphs of the jobs rendered by a worker can share their parsed markup
+with the option ``frags_cache=True``, see :class:`~pdf_generator.styles.FragsCache`.
+
+The results are returned in the order of the jobs, as soon as they are
+available. The errors of a job are caught and reported in its result, the
+other jobs are still rendered.
+"""
+
+from __future__ import absolute_import
+
+import time
+import traceback
+import contextlib
+import collections
+import multiprocessing
+
+from pdf_generator.pdf_generator import Story
+from pdf_generator.styles import frags_cache as process_frags_cache
+
+__all__ = [
+    'RenderJob',
+    'RenderResult',
+    'render_many',
+]
+
+
+RenderJob = collections.namedtuple('RenderJob', [
+    'template',
+    'flowables',
+    'out',
+    'title',
+    'author',
+    'options',
+], defaults=[None])
+RenderJob.__doc__ = """
+A document to render by :func:`render_many`.
+
+*flowables* is a callable without arguments returning the flowables of the
+story. *out* is the path of the PDF. *options* is an optional dict of keywords
+passed to :meth:`Story.build`.
+"""
+
+RenderResult = collections.namedtuple('RenderResult', [
+    'index',
+    'out',
+    'duration',
+    'error',
+])
+RenderResult.__doc__ = """
+The result of the job at *index*. *error* is ``None`` or the formatted
+traceback of the exception raised by the job.
+"""
+
+
+_worker_templates = []
+
+
+def _init_worker(templates):
+    _worker_templates[:] = templates
+
+
+def _render(task):
+    index, template_index, flowables, out, title, author, options = task
+    start = time.time()
+    try:
+        options = options or {}
+        cache = options.get('frags_cache')
+        if cache is True:
+            cache = process_frags_cache
+
+        story = Story(_worker_templates[template_index])
+        with cache if cache is not None else contextlib.nullcontext():
+            story.extend(flowables())
+        with open(out, 'wb') as out_file:
+            story.build(out_file, title, author, **options)
+    except Exception:
+        return RenderResult(index, out, time.time() - start, traceback.format_exc())
+    return RenderResult(index, out, time.time() - start, None)
+
+
+def _get_tasks(jobs):
+    templates = []
+    template_indexes = {}
+    tasks = []
+    for index, job in enumerate(jobs):
+        job = RenderJob(*job)
+        key = id(job.template)
+        if key not in template_indexes:
+            template_indexes[key] = len(templates)
+            templates.append(job.template)
+
+        tasks.append((index, template_indexes[key], job.flowables,
+                      job.out, job.title, job.author, job.options))
+    return templates, tasks
+
+
+def render_many(jobs, workers=None, chunksize=1):
+    """
+    Renders the :class:`RenderJob` *jobs* with *workers* processes and yields
+    a :class:`RenderResult` for each of them, in order.
+
+    *workers* defaults to the number of CPUs. When *workers* is 1, the jobs
+    are rendered in the current process.
+    """
+    templates, tasks = _get_tasks(jobs)
+
+    if workers == 1:
+        _init_worker(templates)
+        for task in tasks:
+            yield _render(task)
+        return
+
+    with multiprocessing.Pool(workers, _init_worker, (templates, )) as pool:
+        results = pool.imap(_render, tasks, chunksize)
+        for task in tasks:
+            try:
+                yield next(results)
+            except Exception:
+                # The job could not be sent to the worker
+                yield RenderResult(task[0], task[3], 0, traceback.format_exc())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Caches
+======
+
+:class:`LRUCache` is a thread-safe mapping keeping at most *maxsize* items.
+When it's full, the least recently used item is evicted.
+
+>>> cache = LRUCache(maxsize=2)
+>>> cache['a'] = 1
+>>> cache['b'] = 2
+>>> cache.get('a')
+1
+>>> cache['c'] = 3  # evicts 'b'
+>>> cache.get('b') is None
+True
+
+The cache counts its hits and misses, reported by :attr:`LRUCache.hit_rate`.
+
+:class:`DirectoryCache` is the base of the caches keeping their values in a
+:class:`LRUCache` and, optionally, their data in the files of a directory
+shared by the processes using it.
+"""
+
+from __future__ import absolute_import
+
+import os
+import tempfile
+import threading
+import collections
+
+__all__ = [
+    'LRUCache',
+    'DirectoryCache',
+]
+
+
+class LRUCache(object):
+    """
+    A mapping of at most *maxsize* items evicting the least recently used.
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the value of *key* or *default* and counts a hit or a miss.
+        """
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        """
+        Removes all the items and resets the counters.
+        """
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+    @property
+    def hit_rate(self):
+        """
+        The ratio of the lookups that were hits, 0 when there was none.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / float(lookups) if lookups else 0.
+
+
+class DirectoryCache(object):
+    """
+    A base of the caches keeping at most *maxsize* values in memory. When a
+    *directory* is given, the data of the values are also stored in files
+    named by their key and :attr:`suffix`, and shared with the other
+    processes using the same directory.
+    """
+    suffix = ''
+
+    def __init__(self, maxsize, directory=None):
+        self.directory = directory
+        self._memory = LRUCache(maxsize)
+
+    @property
+    def hit_rate(self):
+        """
+        The hit rate of the values kept in memory.
+        """
+        return self._memory.hit_rate
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _load(self, key):
+        # The bytes stored for key, None without directory or file
+        if self.directory is None:
+            return None
+        try:
+            with open(self._get_path(key), 'rb') as stored:
+                return stored.read()
+        except IOError:
+            return None
+
+    def _store(self, key, data):
+        if self.directory is None:
+            return
+        # Written in a temporary file renamed when complete, the other
+        # processes never read a partial file.
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as out:
+            out.write(data)
+        os.replace(path, self._get_path(key))
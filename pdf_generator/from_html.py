@@ -12,30 +12,61 @@ Transforms HTML in PDF templates.
 
 
 The supported tags are: h1-h6, p, center, blockquote, a, br, ul, li
+
+Big documents are read from a file by chunks with :func:`iter_html_flowables`,
+yielding the flowables as soon as they are parsed:
+
+>>> with io.open('export.html', encoding='utf-8') as html:
+...     story.extend(iter_html_flowables(html, PathMediasLocator('/var/www/medias')))
+
+The parsing of the html can be cached by a :class:`HTMLCache`. The cache
+keeps the events of the parsing (:func:`parse_events`) and new flowables are
+created from them at each call:
+
+>>> cache = HTMLCache(maxsize=100, directory='/var/cache/pdf_generator')
+>>> html_to_rlab(legal_notice, locator, cache=cache)
+
+Many texts are parsed by a pool of processes with :func:`html_to_rlab_many`,
+the flowables being created from the events in the current process:
+
+>>> cards = html_to_rlab_many([p.description for p in products], locator, workers=4)
+
+The medias of a :class:`~pdf_generator.medias.PrefetchMediasLocator`, or of
+one wrapped by a :class:`~pdf_generator.medias.CachedMediasLocator`, found
+by :func:`find_medias` are read before the parsing.
 """
 
 from __future__ import absolute_import
 
+import re
 import six
+import json
+import hashlib
+import multiprocessing
 
-from io import StringIO
+from html import unescape
 from six.moves.html_parser import HTMLParser
 from collections import deque
 
 from reportlab.platypus import (
-    Image,
     Table,
     XBox,
     TableStyle,
 )
 from reportlab.lib import enums
-from reportlab.lib.styles import ParagraphStyle
 
-from pdf_generator.medias import NoMediasLocator, PLACEHOLDER
-from pdf_generator.styles import Paragraph
+from pdf_generator.medias import NoMediasLocator, CachedMediasLocator, PrefetchMediasLocator, PLACEHOLDER
+from pdf_generator.styles import Paragraph, Image, get_style
+from pdf_generator.cache import DirectoryCache
 
 __all__ = [
-    'html_to_rlab'
+    'html_to_rlab',
+    'html_to_rlab_many',
+    'iter_html_flowables',
+    'find_medias',
+    'parse_events',
+    'parse_many',
+    'HTMLCache',
 ]
 
 
@@ -43,10 +74,34 @@ table_style_center = TableStyle([
     ('ALIGNMENT', (0, 0), (-1, -1), 'CENTER')
 ])
 
+_img_src = re.compile(r'''<img\b[^>]*?\ssrc\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+
+
+def find_medias(text):
+    """
+    Returns the list of the srcs of the img tags of the html *text*.
+
+    The tags are found without parsing the html, the list may contain the
+    srcs of tags in comments or in scripts.
 
-def html_to_rlab(text, media_locator=None, link_handler=None):
+    >>> find_medias('<p><img src="/logo.png" /></p>')
+    ['/logo.png']
     """
-    Transforms text from html string to a list of flowables.
+    return [unescape(u''.join(match.groups(u''))) for match in _img_src.finditer(text)]
+
+
+def _prefetch(media_locator, texts):
+    if isinstance(media_locator, CachedMediasLocator):
+        media_locator = media_locator.locator
+    if isinstance(media_locator, PrefetchMediasLocator):
+        for text in texts:
+            media_locator.prefetch(find_medias(text))
+
+
+def html_to_rlab(text, media_locator=None, link_handler=None, flat=False, cache=None):
+    """
+    Transforms text from html string to a table of flowables or, if *flat* is
+    true, to a list of flowables.
 
     The medias (from the img tags) are located by the media_locator. By default
     an instance of :class:`pdf_generator.medias.NoMediasLocator` is used that
@@ -61,19 +116,195 @@ def html_to_rlab(text, media_locator=None, link_handler=None):
 
     >>> html_to_rlab('<a href="/index.html">Index</a>', link_handler='http://example.com')
     Paragraph('<link href="http://example.com/index.html">Index</link>')
+
+    The flat list is laid out faster than the table, that is wrapped as a
+    whole and split on each page. In the flat list, the lists are flattened
+    and the content of the center tags is centered by the alignment of the
+    paragraphs and of the other flowables, instead of a centered table.
+
+    >>> story.extend(html_to_rlab(article, flat=True))
+
+    When a :class:`HTMLCache` *cache* is given, the parsing is looked up in
+    it.
     """
 
-    if isinstance(link_handler, six.string_types):
-        link_handler = PrefixLinkHandler(link_handler)
+    _prefetch(media_locator, [text])
+    parser = _get_parser(media_locator, link_handler, flat)
+    if cache is None:
+        parser.feed(text)
+    else:
+        parser.replay(cache.get_events(text))
+    return _get_result(parser, flat)
+
+
+def html_to_rlab_many(texts, media_locator=None, link_handler=None, flat=False, workers=None, chunksize=16):
+    """
+    Transforms many html *texts* as :func:`html_to_rlab` and returns the list
+    of the results.
+
+    The texts are parsed by :func:`parse_many` with *workers* processes, the
+    flowables are created in the current process.
+    """
+    texts = list(texts)
+    _prefetch(media_locator, texts)
+    results = []
+    for events in parse_many(texts, workers, chunksize):
+        parser = _get_parser(media_locator, link_handler, flat)
+        parser.replay(events)
+        results.append(_get_result(parser, flat))
+    return results
+
+
+def _get_result(parser, flat):
+    if flat:
+        return list(_flatten(parser.get_result()))
 
-    parser = Parser(media_locator or NoMediasLocator(), link_handler)
-    parser.feed(text)
     content = [[x] for x in parser.get_result()]
     return Table(content)
 
+
+def iter_html_flowables(stream, media_locator=None, link_handler=None, chunk_size=65536):
+    """
+    Reads the html from the text file-like *stream* by chunks of *chunk_size*
+    characters and yields the flowables as soon as their top level element is
+    closed.
+
+    The lists are flattened, the flowables can be appended to a story. The
+    *media_locator* and *link_handler* are the ones of :func:`html_to_rlab`.
+    """
+    parser = _get_parser(media_locator, link_handler, flat=True)
+    parsed = parser.stack[0]
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+
+        _prefetch(media_locator, [chunk])
+        parser.feed(chunk)
+        for flowable in _flatten(parsed):
+            yield flowable
+        del parsed[:]
+
+    parser.close()
+    for flowable in _flatten(parser.get_result()):
+        yield flowable
+
+
+def _get_parser(media_locator, link_handler, flat=False):
+    if isinstance(link_handler, six.string_types):
+        link_handler = PrefixLinkHandler(link_handler)
+
+    return Parser(media_locator or NoMediasLocator(), link_handler, flat)
+
+
+def _flatten(values):
+    for value in values:
+        if isinstance(value, list):
+            for flowable in _flatten(value):
+                yield flowable
+        else:
+            yield value
+
 # pop, call fn and add result
 
 
+class EventRecorder(HTMLParser):
+    """
+    A html parser recording the events of the parsing, replayed by
+    :meth:`Parser.replay`.
+    """
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.events = []
+
+    def handle_starttag(self, tag, attrs):
+        self.events.append(('start', tag, attrs, self.get_starttag_text()))
+
+    def handle_startendtag(self, tag, attrs):
+        self.events.append(('startend', tag, attrs, self.get_starttag_text()))
+
+    def handle_endtag(self, tag):
+        self.events.append(('end', tag))
+
+    def handle_data(self, data):
+        self.events.append(('data', data))
+
+
+def parse_events(text):
+    """
+    Returns the events of the parsing of the html *text*, a picklable list of
+    tuples.
+    """
+    recorder = EventRecorder()
+    recorder.feed(text)
+    recorder.close()
+    return recorder.events
+
+
+def parse_many(texts, workers=None, chunksize=16):
+    """
+    Returns the list of the events of the parsing of each of the html
+    *texts*, parsed by a pool of *workers* processes sent *chunksize* texts
+    at once.
+
+    *workers* defaults to the number of CPUs. When *workers* is 1, the texts
+    are parsed in the current process.
+    """
+    if workers == 1:
+        return [parse_events(text) for text in texts]
+
+    with multiprocessing.Pool(workers) as pool:
+        return pool.map(parse_events, texts, chunksize)
+
+
+def _load_event(event):
+    # The tuples of the events are read from JSON as lists
+    if event[0] in ('start', 'startend'):
+        kind, tag, attrs, text = event
+        return kind, tag, [(name, value) for name, value in attrs], text
+    kind, value = event
+    return kind, value
+
+
+class HTMLCache(DirectoryCache):
+    """
+    A cache of the events of the parsing of html texts, keyed by the hash of
+    the texts.
+
+    It keeps at most *maxsize* parsings in memory. When a *directory* is
+    given, the parsings are also stored in it in JSON, and shared with the
+    other processes using the same directory. The unreadable files are
+    ignored and parsed again.
+    """
+    suffix = '.json'
+
+    def __init__(self, maxsize=256, directory=None):
+        DirectoryCache.__init__(self, maxsize, directory)
+
+    def get_events(self, text):
+        """
+        Returns the events of the parsing of *text*, parsed if needed.
+        """
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        events = self._memory.get(key)
+        if events is None:
+            events = self._load_events(key)
+            if events is None:
+                events = parse_events(text)
+                self._store(key, json.dumps(events).encode('utf-8'))
+            self._memory[key] = events
+        return events
+
+    def _load_events(self, key):
+        data = self._load(key)
+        if data is None:
+            return None
+        try:
+            return [_load_event(event) for event in json.loads(data.decode('utf-8'))]
+        except (ValueError, TypeError):
+            return None
+
+
 class PrefixLinkHandler(object):
     def __init__(self, prefix):
         self.prefix = prefix.rstrip(u'/')
@@ -91,6 +322,15 @@ class Rules(object):
     def __contains__(self, value):
         return hasattr(self, value)
 
+    def get_handlers(self):
+        """
+        Returns a dict of the handlers of the rules by tag, the public
+        methods of the class bound to the instance.
+        """
+        return dict((name, getattr(self, name)) for name in dir(type(self))
+                    if not name.startswith('_') and callable(getattr(type(self), name)) and
+                    name != 'get_handlers')
+
 
 class StartEndRules(Rules):
     def __init__(self, media_locator, link_handler):
@@ -112,6 +352,8 @@ class StartEndRules(Rules):
         if src is PLACEHOLDER:
             return XBox(height=height or 40, width=width or 40, text=attrs['src'])
 
+        if isinstance(self.media_locator, CachedMediasLocator):
+            return self.media_locator.get_image(src, width, height)
         return Image(src, height=height, width=width)
 
     def br(self, tag, attrs):
@@ -141,6 +383,9 @@ class StartRules(StartEndRules):
 
 
 class EndRules(Rules):
+    def __init__(self, flat=False):
+        self.flat = flat
+
     def a(self, tag, value, stack):
         return u'</link>'
 
@@ -152,16 +397,18 @@ class EndRules(Rules):
     def _center(self, values):
         for x in values:
             if isinstance(x, Paragraph):
-                x.style = ParagraphStyle('center', parent=x.style, alignment=enums.TA_CENTER)
-            elif isinstance(x, Image):
-                x.hAlign = 'CENTER'
+                x.style = get_style(x.style, alignment=enums.TA_CENTER)
             elif isinstance(x, list):
                 self._center(x)
+            else:
+                x.hAlign = 'CENTER'
         return values
 
     def center(self, tag, value, stack):
         if value.strip():
             stack.append(Paragraph(value))
+        if self.flat:
+            return self._center(stack)
         return Table([[x] for x in self._center(stack)], style=table_style_center)
 
     def stacked(self, tag, value, stack):
@@ -187,19 +434,25 @@ class EndRules(Rules):
 
 
 class Parser(HTMLParser):
-    def __init__(self, media_locator, link_handler):
+    def __init__(self, media_locator, link_handler, flat=False):
         HTMLParser.__init__(self)
         self.handlers_start = StartRules(media_locator, link_handler)
         self.handlers_startend = StartEndRules(media_locator, link_handler)
-        self.handlers_end = EndRules()
-
-        self.new_buffer()
+        self.handlers_end = EndRules(flat)
+        # Resolved once, the rules are looked up for each tag
+        self._start = self.handlers_start.get_handlers()
+        self._startend = self.handlers_startend.get_handlers()
+        self._end = self.handlers_end.get_handlers()
+
+        self._starttag_text = None
+        self.buff = []
         self.stack = deque()
         self.stack.append([])
 
     def handle_starttag(self, tag, attrs):
-        if tag in self.handlers_start:
-            value = self.handlers_start[tag](tag, attrs)
+        handler = self._start.get(tag)
+        if handler is not None:
+            value = handler(tag, attrs)
             if isinstance(value, six.string_types):
                 self.add_buffer(value)
             elif value is None:
@@ -214,8 +467,9 @@ class Parser(HTMLParser):
             self.add_buffer(self.get_starttag_text())
 
     def handle_startendtag(self, tag, attrs):
-        if tag in self.handlers_startend:
-            value = self.handlers_startend[tag](tag, attrs)
+        handler = self._startend.get(tag)
+        if handler is not None:
+            value = handler(tag, attrs)
             if isinstance(value, six.string_types):
                 self.add_buffer(value)
             elif value is None:
@@ -227,23 +481,22 @@ class Parser(HTMLParser):
             self.add_buffer(self.get_starttag_text())
 
     def handle_endtag(self, tag):
-        if tag in self.handlers_end:
+        handler = self._end.get(tag)
+        if handler is not None:
             stack = self.stack.pop()
             buffer = self.clean_buffer()
-            value = self.handlers_end[tag](tag, buffer, stack)
+            value = handler(tag, buffer, stack)
 
             if isinstance(value, six.string_types):
                 self.add_buffer(buffer)
                 self.add_buffer(value)
                 self.stack.append(stack)
             elif isinstance(value, Paragraph) or value is None:
-                if len(stack) == 1 and not value:
-                    self.stack[-1].append(stack[0])
-                elif not stack and value:
+                # The content of the block is given back to its parent, the
+                # top level flowables are complete as soon as they are closed
+                self.stack[-1].extend(stack)
+                if value:
                     self.stack[-1].append(value)
-                elif value:
-                    stack.append(value)
-                    self.stack.append(stack)
             else:
                 self.stack[-1].append(value)
 
@@ -251,11 +504,34 @@ class Parser(HTMLParser):
             self.add_buffer(u'</%s>' % tag)
 
     def handle_data(self, data):
-        self.add_buffer(data)
+        self.buff.append(data)
+
+    def get_starttag_text(self):
+        if self._starttag_text is not None:
+            return self._starttag_text
+        return HTMLParser.get_starttag_text(self)
+
+    def replay(self, events):
+        """
+        Handles the *events* recorded by an :class:`EventRecorder` as if their
+        html was fed.
+        """
+        for event in events:
+            kind = event[0]
+            if kind == 'data':
+                self.handle_data(event[1])
+            elif kind == 'end':
+                self.handle_endtag(event[1])
+            else:
+                self._starttag_text = event[3]
+                if kind == 'start':
+                    self.handle_starttag(event[1], event[2])
+                else:
+                    self.handle_startendtag(event[1], event[2])
+        self._starttag_text = None
 
     def add_buffer(self, text):
-        self.buff_clean = False
-        self.buff.write(text)
+        self.buff.append(text)
 
     def push_buffer(self):
         content = self.clean_buffer()
@@ -263,17 +539,14 @@ class Parser(HTMLParser):
             self.stack[-1].append(Paragraph(content))
 
     def clean_buffer(self, *args, **kw):
-        if self.buff_clean:
+        # The segments are joined once, when the block is complete
+        if not self.buff:
             return ''
 
-        text = self.buff.getvalue()
-        self.new_buffer()
+        text = u''.join(self.buff)
+        del self.buff[:]
         return text
 
-    def new_buffer(self):
-        self.buff_clean = True
-        self.buff = StringIO()
-
     def get_result(self):
         # empty last buffer
         self.push_buffer()
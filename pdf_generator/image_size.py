@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Image size
+==========
+
+:func:`get_image_size` reads the size of the PNG, JPEG and GIF images from
+their headers, without decoding their pixels.
+
+>>> get_image_size('/var/www/medias/logo.png')
+(640, 480)
+
+The sizes are cached by path and modification time.
+"""
+
+from __future__ import absolute_import
+
+import os
+import struct
+
+from pdf_generator.cache import LRUCache
+
+__all__ = [
+    'get_image_size',
+]
+
+
+_sizes = LRUCache(maxsize=1024)
+_unknown = object()
+
+# The JPEG markers of the start of a frame, giving the size of the image
+_sof_markers = frozenset([0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF])
+
+
+def get_image_size(path):
+    """
+    Returns the width and the height in pixels of the image at *path*, or
+    ``None`` when its format is not PNG, JPEG nor GIF.
+    """
+    key = (path, os.stat(path).st_mtime)
+    size = _sizes.get(key, _unknown)
+    if size is _unknown:
+        with open(path, 'rb') as image:
+            size = read_image_size(image)
+        _sizes[key] = size
+    return size
+
+
+def read_image_size(image):
+    """
+    Returns the width and the height of the image in the binary file-like
+    *image* read from its current position, or ``None``.
+    """
+    header = image.read(26)
+    if header.startswith(b'\x89PNG\r\n\x1a\n') and header[12:16] == b'IHDR':
+        return struct.unpack('>II', header[16:24])
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return struct.unpack('<HH', header[6:10])
+    if header.startswith(b'\xff\xd8'):
+        image.seek(-len(header) + 2, os.SEEK_CUR)
+        return _read_jpeg_size(image)
+    return None
+
+
+def _read_jpeg_size(image):
+    while True:
+        byte = image.read(1)
+        if not byte:
+            return None
+        if byte != b'\xff':
+            continue
+
+        marker = image.read(1)
+        while marker == b'\xff':
+            marker = image.read(1)
+        if not marker:
+            return None
+
+        marker = ord(marker)
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            # Without a segment
+            continue
+
+        length = image.read(2)
+        if len(length) < 2:
+            return None
+        length, = struct.unpack('>H', length)
+        if marker in _sof_markers:
+            segment = image.read(5)
+            if len(segment) < 5:
+                return None
+            height, width = struct.unpack('>HH', segment[1:5])
+            return width, height
+        image.seek(length - 2, os.SEEK_CUR)
@@ -11,11 +11,46 @@ Medias locator returns a path on the file system from the *src* of an img tag.
 
     A special object that indicates to the renderer to use a placeholder
     instead of a media.
+
+The images can be read from an :class:`ImageCache`, decoding each source
+once and downsampling it to the size it's drawn at. A
+:class:`CachedMediasLocator` gives the images of a locator from the cache to
+:func:`~pdf_generator.from_html.html_to_rlab`:
+
+>>> locator = CachedMediasLocator(PathMediasLocator('/var/www/medias'),
+...                               ImageCache(dpi=150, directory='/var/cache/pdf_generator'))
+>>> html_to_rlab('<img src="logo.png" width="120" />', locator)
+
+A :class:`PrefetchMediasLocator` reads the medias in a pool of threads
+before they are used. :func:`~pdf_generator.from_html.html_to_rlab` finds
+the medias of the html and prefetches them before the parsing:
+
+>>> locator = PrefetchMediasLocator(PathMediasLocator('/mnt/nfs/medias'), workers=8)
+>>> flowables = html_to_rlab(article, locator)
+
+The prefetched medias are also cached when the :class:`PrefetchMediasLocator`
+is wrapped by the :class:`CachedMediasLocator`, the images are then keyed by
+their content:
+
+>>> locator = CachedMediasLocator(PrefetchMediasLocator(PathMediasLocator('/mnt/nfs/medias')),
+...                               ImageCache(dpi=150))
 """
 
 from __future__ import absolute_import
 
-import os.path
+import io
+import os
+import math
+import hashlib
+import threading
+import concurrent.futures
+
+from PIL import Image as PILImage
+from reportlab.lib.utils import ImageReader
+
+from pdf_generator.cache import DirectoryCache
+from pdf_generator.image_size import get_image_size, read_image_size
+from pdf_generator.styles import CachedImage
 
 
 PLACEHOLDER = object()
@@ -48,3 +83,181 @@ class DebugMediasLocator(object):
 
     def __call__(self, path):
         return PLACEHOLDER
+
+
+class CachedMediasLocator(object):
+    """
+    Locates the medias with *locator* and creates their images from the
+    :class:`ImageCache` *cache*.
+    """
+    def __init__(self, locator, cache=None):
+        self.locator = locator
+        self.cache = cache if cache is not None else ImageCache()
+
+    def __call__(self, path):
+        return self.locator(path)
+
+    def get_image(self, path, width=None, height=None):
+        return self.cache.get_image(path, width, height)
+
+
+class ImageCache(DirectoryCache):
+    """
+    A cache of the decoded images, downsampled to *dpi* dots per inch of their
+    drawn size.
+
+    It keeps at most *maxsize* images in memory. When a *directory* is given,
+    the downsampled images are also stored in it, and shared with the other
+    processes using the same directory.
+    """
+    suffix = '.image'
+
+    def __init__(self, maxsize=64, directory=None, dpi=150):
+        DirectoryCache.__init__(self, maxsize, directory)
+        self.dpi = dpi
+
+    def get_image(self, path, width=None, height=None, kind='direct', **kw):
+        """
+        Returns a :class:`~pdf_generator.styles.CachedImage` of the file at
+        *path* drawn at *width* and *height*, by default the size of the
+        source.
+
+        The images of the same file drawn at the same size share their
+        decoded image.
+        """
+        if kind not in ('direct', 'absolute'):
+            # The width and the height are not the drawn size
+            reader, size = self.get_reader(path)
+            return CachedImage(reader, width, height, kind=kind, **kw)
+
+        reader, size = self.get_reader(path, width, height)
+        return CachedImage(reader, width or size[0], height or size[1], **kw)
+
+    def get_reader(self, path, width=None, height=None):
+        """
+        Returns the :class:`~reportlab.lib.utils.ImageReader` of the file at
+        *path* downsampled for *width* and *height*, and the size of the
+        source.
+
+        *path* may also be a binary file-like, as returned by a
+        :class:`PrefetchMediasLocator`, the images are then keyed by the hash
+        of its content.
+        """
+        source, version = self._get_source(path)
+        key = version + (width, height)
+        value = self._memory.get(key)
+        if value is None:
+            value = self._read(source, version, width, height)
+            self._memory[key] = value
+        return value
+
+    def _get_source(self, path):
+        # The path or the content of the image, and the key of its version
+        if hasattr(path, 'read'):
+            data = path.read()
+            return data, (hashlib.sha1(data).hexdigest(),)
+        stat = os.stat(path)
+        return path, (os.path.abspath(path), stat.st_mtime, stat.st_size)
+
+    def _open(self, source):
+        if isinstance(source, bytes):
+            return io.BytesIO(source)
+        return source
+
+    def _get_size(self, size, width, height):
+        # The size in pixels of the image drawn at width x height points
+        scale = self.dpi / 72.
+        return (min(size[0], int(math.ceil((width or size[0]) * scale))),
+                min(size[1], int(math.ceil((height or size[1]) * scale))))
+
+    def _read(self, source, version, width, height):
+        if isinstance(source, bytes):
+            source_size = read_image_size(io.BytesIO(source))
+        else:
+            source_size = get_image_size(source)
+        if source_size is not None and self._get_size(source_size, width, height) == source_size:
+            return ImageReader(self._open(source)), source_size
+
+        with PILImage.open(self._open(source)) as image:
+            source_size = image.size
+            size = self._get_size(source_size, width, height)
+            if size == source_size:
+                return ImageReader(self._open(source)), source_size
+
+            image_format = 'JPEG' if image.format == 'JPEG' else 'PNG'
+            key = hashlib.sha1(repr(version + (size,)).encode('utf-8'))
+            data = self._load(key.hexdigest())
+            if data is None:
+                data = self._resize(image, size, image_format)
+                self._store(key.hexdigest(), data)
+        return ImageReader(io.BytesIO(data)), source_size
+
+    def _resize(self, image, size, image_format):
+        if image.mode not in ('1', 'L', 'LA', 'RGB', 'RGBA', 'CMYK'):
+            image = image.convert('RGBA')
+        out = io.BytesIO()
+        image.resize(size, PILImage.LANCZOS).save(out, image_format, quality=90)
+        return out.getvalue()
+
+
+def read_file(path):
+    """
+    Returns the content of the file at *path*.
+    """
+    with open(path, 'rb') as media:
+        return media.read()
+
+
+class PrefetchMediasLocator(object):
+    """
+    Locates the medias with *locator* and reads them with *fetch* in a pool
+    of *workers* threads.
+
+    *fetch* is called with the location of a media and returns its content,
+    by default the file at this path is read. It may read it from another
+    store, for instance with :func:`urllib.request.urlopen`.
+
+    The locator returns a file-like of the content of the media, waiting for
+    it if it's still read. The contents are kept until :meth:`close`.
+
+    To cache the images, the :class:`CachedMediasLocator` wraps this locator,
+    not the opposite: the file-likes are then given to its
+    :class:`ImageCache`.
+    """
+    def __init__(self, locator, workers=4, fetch=read_file):
+        self.locator = locator
+        self.fetch = fetch
+        self._executor = concurrent.futures.ThreadPoolExecutor(workers)
+        self._medias = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, paths):
+        """
+        Starts the reading of the medias at *paths*, the srcs of img tags.
+        """
+        for path in paths:
+            self._get_future(path)
+
+    def _get_future(self, path):
+        location = self.locator(path)
+        if location is PLACEHOLDER:
+            return None
+
+        with self._lock:
+            future = self._medias.get(location)
+            if future is None:
+                future = self._medias[location] = self._executor.submit(self.fetch, location)
+            return future
+
+    def __call__(self, path):
+        future = self._get_future(path)
+        if future is None:
+            return PLACEHOLDER
+        return io.BytesIO(future.result())
+
+    def close(self):
+        """
+        Waits for the readings and forgets the contents.
+        """
+        self._executor.shutdown()
+        self._medias.clear()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF concatenation
+=================
+
+:func:`concatenate` writes the pages of many PDF generated by reportlab in a
+single PDF. The objects of the documents are copied without being decoded,
+only their references are renumbered. The pages are gathered in a new page
+tree, the meta datas are the ones of the first document.
+
+>>> with open('out.pdf', 'wb') as out:
+...     concatenate([first_part, second_part], out)
+
+The :class:`PDFWriter` writes the objects of each document as soon as it's
+added, only the positions of the objects and the references of the pages are
+kept until the cross reference table is written by :meth:`PDFWriter.close`:
+
+>>> writer = PDFWriter(out)
+>>> for part in render_parts():
+...     writer.add(part)
+>>> writer.close()
+
+The objects without references to other objects, as the images, the fonts or
+the static forms, are written once when they are the same in many documents.
+
+It only supports the documents written by reportlab: without object streams,
+cross reference streams, incremental updates nor encryption. The outlines and
+the names of the catalogs are not kept: the concatenated PDF has no bookmarks
+nor named destinations. The links of reportlab to an explicit destination in
+their own document are kept.
+"""
+
+from __future__ import absolute_import
+
+import re
+import hashlib
+
+__all__ = [
+    'concatenate',
+    'PDFWriter',
+]
+
+
+_startxref = re.compile(br'startxref\s+(\d+)\s+%%EOF\s*$')
+_xref_entry = re.compile(br'(\d{10}) (\d{5}) ([nf])')
+_object_header = re.compile(br'\d+ \d+ obj\s')
+_stream = re.compile(br'>>\s*stream\r?\n')
+_reference = re.compile(br'(\d+) 0 R\b')
+_kids = re.compile(br'/Kids\s*\[([^\]]*)\]')
+
+
+def _get_reference(body, key):
+    match = re.search(b'/' + key + br'\s+(\d+) 0 R', body)
+    if match is None:
+        raise ValueError('Unexpected PDF, no /{0} reference'.format(key.decode('ascii')))
+    return int(match.group(1))
+
+
+class _PDF(object):
+    """
+    The objects of a PDF written by reportlab.
+    """
+    def __init__(self, data):
+        data = bytes(data)
+        match = _startxref.search(data)
+        if match is None:
+            raise ValueError('Unexpected PDF, no startxref')
+
+        xref = int(match.group(1))
+        trailer = data.index(b'trailer', xref)
+        offsets = {}
+        for number, entry in enumerate(_xref_entry.finditer(data, xref, trailer)):
+            offset, generation, kind = entry.groups()
+            if kind == b'n':
+                offsets[number] = int(offset)
+
+        self.header = data[:min(offsets.values())]
+
+        ends = sorted(offsets.values()) + [xref]
+        next_offsets = dict(zip(ends, ends[1:]))
+        self.objects = {}
+        for number, offset in offsets.items():
+            body = data[offset:next_offsets[offset]]
+            body = body[_object_header.match(body).end():body.rindex(b'endobj')]
+            self.objects[number] = body
+
+        self.root = _get_reference(data[trailer:], b'Root')
+        self.info = _get_reference(data[trailer:], b'Info')
+        self.page_tree = set()
+        self.pages = []
+        self._walk(_get_reference(self.objects[self.root], b'Pages'))
+
+    def _walk(self, number):
+        body = self.objects[number]
+        if re.search(br'/Type\s*/Pages\b', body) is None:
+            self.pages.append(number)
+            return
+
+        self.page_tree.add(number)
+        for kid in _reference.finditer(_kids.search(body).group(1)):
+            self._walk(int(kid.group(1)))
+
+
+def _get_dictionary(body):
+    match = _stream.search(body)
+    return body[:match.start()] if match else body
+
+
+def _renumber(body, numbers):
+    dictionary = _get_dictionary(body)
+    return _reference.sub(lambda m: b'%d 0 R' % numbers[int(m.group(1))], dictionary) + body[len(dictionary):]
+
+
+# The numbers of the page tree and of the catalog written by PDFWriter.close
+_PAGES = 1
+_ROOT = 2
+
+
+class PDFWriter(object):
+    """
+    Writes in the file-like *out* the pages of the PDF added by :meth:`add`.
+    The meta datas are the ones of the first document, the outlines and the
+    names of the documents are dropped.
+    """
+    def __init__(self, out):
+        self.out = out
+        self._position = 0
+        self._offsets = [None, None]
+        self._kids = []
+        self._info = None
+        self._leaves = {}
+        self._digest = hashlib.md5()
+
+    def _write(self, data):
+        self.out.write(data)
+        self._position += len(data)
+
+    def _write_object(self, number, body):
+        chunk = b'%d 0 obj\n%sendobj\n' % (number, body)
+        self._digest.update(chunk)
+        self._offsets[number - 1] = self._position
+        self._write(chunk)
+
+    def add(self, data):
+        """
+        Writes the objects of the PDF in the bytes *data*.
+        """
+        pdf = _PDF(data)
+        if self._info is None:
+            self._write(pdf.header)
+
+        numbers = dict.fromkeys(pdf.page_tree, _PAGES)
+        numbers[pdf.root] = _ROOT
+        if self._info is not None:
+            numbers[pdf.info] = self._info
+
+        copies = []
+        for number in sorted(pdf.objects):
+            if number in numbers:
+                continue
+
+            body = pdf.objects[number]
+            dictionary = _get_dictionary(body)
+            key = None
+            if _reference.search(dictionary) is None and b'/Annot' not in dictionary:
+                key = hashlib.sha1(body).digest()
+                if key in self._leaves:
+                    numbers[number] = self._leaves[key]
+                    continue
+
+            self._offsets.append(None)
+            numbers[number] = len(self._offsets)
+            if key is not None:
+                self._leaves[key] = numbers[number]
+            copies.append(number)
+
+        if self._info is None:
+            self._info = numbers[pdf.info]
+        for number in copies:
+            self._write_object(numbers[number], _renumber(pdf.objects[number], numbers))
+        self._kids.extend(numbers[page] for page in pdf.pages)
+
+    def close(self):
+        """
+        Writes the page tree, the catalog, the cross reference table and the
+        trailer.
+        """
+        if self._info is None:
+            raise ValueError('No PDF to concatenate')
+
+        self._write_object(_PAGES, b'<<\n/Count %d /Kids [ %s ] /Type /Pages\n>>' % (
+            len(self._kids), b' '.join(b'%d 0 R' % kid for kid in self._kids)))
+        self._write_object(_ROOT, b'<<\n/PageMode /UseNone /Pages %d 0 R /Type /Catalog\n>>' % _PAGES)
+
+        position = self._position
+        self._write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(self._offsets) + 1))
+        self._write(b''.join(b'%010d 00000 n \n' % offset for offset in self._offsets))
+        file_id = self._digest.hexdigest().encode('ascii')
+        self._write(b'trailer\n<<\n/ID \n[<%s><%s>]\n/Info %d 0 R\n/Root %d 0 R\n/Size %d\n>>\n' % (
+            file_id, file_id, self._info, _ROOT, len(self._offsets) + 1))
+        self._write(b'startxref\n%d\n%%%%EOF\n' % position)
+
+
+def concatenate(pdfs, out):
+    """
+    Writes in the file-like *out* the pages of each of the PDF in *pdfs*, an
+    iterable of bytes.
+    """
+    writer = PDFWriter(out)
+    for pdf in pdfs:
+        writer.add(pdf)
+    writer.close()
+    return out
@@ -18,6 +18,21 @@ This examples prints the page number as "1/2" and "2/2" in the top right corner:
 ...                  canvasmaker=NumberedCanvasFactory(-1 * units.cm, 1.5 * units.cm, '{0}/{1}'),
 ...                  )
 
+The :class:`NumberedCanvas` keeps every page until the document is saved, as
+the total number of pages is only known at the end. The memory of a long
+document is bounded by :meth:`Story.build` with ``streaming=True``, writing
+the pages by segments:
+
+>>> story.build(out, u'Statement', u'Enix',
+...             canvasmaker=NumberedCanvasFactory(-1 * units.cm, 1.5 * units.cm),
+...             streaming=True)
+
+A factory bound to a number of pages by :meth:`NumberedCanvasFactory.bind`
+stamps the pages as soon as they are completed. It can also number the pages
+from an offset, when the document is a part of a bigger one. The builds by
+segments or by chunks of :meth:`Story.build` bind it to the number of pages
+given by :meth:`Story.count_pages`, a layout on a :class:`CountingCanvas`
+that discards everything.
 """
 
 import six
@@ -26,6 +41,7 @@ from reportlab.pdfgen.canvas import Canvas
 
 __all__ = [
     'NumberedCanvasFactory',
+    'CountingCanvas',
 ]
 
 
@@ -40,11 +56,16 @@ class NumberedCanvasFactory(object):
     *text* is the pattern used for representing the page number. The format
     provides 2 values, 0: the current page number and 1 the total number of
     pages.
+
+    When the *page_count* is known, the factory uses a
+    :class:`BoundNumberedCanvas`.
     """
 
-    def __init__(self, x, y, text='{0}/{1}'):
+    def __init__(self, x, y, text='{0}/{1}', page_count=None, page_offset=0):
         self._x = x
         self._y = y
+        self.page_count = page_count
+        self.page_offset = page_offset
         if callable(text):
             self._text = text
         elif isinstance(text, six.string_types):
@@ -52,31 +73,38 @@ class NumberedCanvasFactory(object):
         else:
             raise TypeError('Unexpected value for text: {!r}'.format(text))
 
+    def bind(self, page_count, page_offset=0):
+        """
+        Returns a copy of this factory for a document of *page_count* pages.
+        The pages of the canvas are numbered after *page_offset*.
+        """
+        return NumberedCanvasFactory(self._x, self._y, self._text, page_count, page_offset)
+
     def __call__(self, *args, **kw):
-        return NumberedCanvas(*args,
-                              x=self._x,
-                              y=self._y,
-                              text=self._text,
-                              **kw)
+        canvas_class = NumberedCanvas if self.page_count is None else BoundNumberedCanvas
+        return canvas_class(*args,
+                            x=self._x,
+                            y=self._y,
+                            text=self._text,
+                            page_count=self.page_count,
+                            page_offset=self.page_offset,
+                            **kw)
 
 
-class NumberedCanvas(Canvas):
+class BaseNumberedCanvas(Canvas):
     """
-    :class:`reportlab.pdfgen.canvas.Canvas` subclass supporting page numbers.
+    Base of the canvas printing the page numbers.
     """
     def __init__(self, *args, **kwargs):
         self._nc_x = kwargs.pop('x')
         self._nc_y = kwargs.pop('y')
         self._nc_text = kwargs.pop('text')
+        self._nc_page_count = kwargs.pop('page_count', None)
+        self._nc_page_offset = kwargs.pop('page_offset', 0)
 
         Canvas.__init__(self, *args, **kwargs)
-        self._codes = []
 
-    def showPage(self):
-        self._codes.append(dict(self.__dict__))
-        self._startPage()
-
-    def save(self):
+    def draw_page_number(self, page_number, page_count):
         x, y = self._nc_x, self._nc_y
 
         if x < 0:
@@ -87,14 +115,69 @@ class NumberedCanvas(Canvas):
         else:
             y = - y
 
+        self.setFont('Helvetica', 7)
+        self.drawRightString(x, y, self._nc_text(page_number, page_count))
+
+
+class NumberedCanvas(BaseNumberedCanvas):
+    """
+    :class:`reportlab.pdfgen.canvas.Canvas` subclass supporting page numbers.
+
+    The pages are kept until the document is saved.
+    """
+    def __init__(self, *args, **kwargs):
+        BaseNumberedCanvas.__init__(self, *args, **kwargs)
+        self._codes = []
+
+    def showPage(self):
+        self._codes.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
         for code in self._codes:
             # recall saved page
             self.__dict__.update(code)
-            self.setFont('Helvetica', 7)
-            self.drawRightString(
-                x, y,
-                self._nc_text(self._pageNumber, len(self._codes)),
-            )
+            self.draw_page_number(self._pageNumber, len(self._codes))
             Canvas.showPage(self)
 
         Canvas.save(self)
+
+
+class BoundNumberedCanvas(BaseNumberedCanvas):
+    """
+    :class:`reportlab.pdfgen.canvas.Canvas` subclass supporting page numbers.
+
+    The number of pages is given at the creation of the canvas and each page
+    is stamped when it's completed.
+    """
+    def showPage(self):
+        self.draw_page_number(self._pageNumber + self._nc_page_offset, self._nc_page_count)
+        Canvas.showPage(self)
+
+
+def _discard(self, *args, **kw):
+    pass
+
+
+class CountingCanvas(Canvas):
+    """
+    A canvas that only counts its pages and discards everything drawn.
+
+    The drawing methods do nothing, the images are neither read nor embedded,
+    the texts and the paths are not formatted.
+    """
+    drawImage = drawInlineImage = doForm = _discard
+    drawText = drawString = drawRightString = drawCentredString = drawAlignedString = _discard
+    drawPath = clipPath = _discard
+    line = lines = grid = bezier = arc = rect = roundRect = circle = ellipse = wedge = _discard
+
+    def showPage(self):
+        self._startPage()
+
+    @property
+    def page_count(self):
+        return self._pageNumber - 1
+
+    def save(self):
+        if len(self._code):
+            self.showPage()
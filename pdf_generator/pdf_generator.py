@@ -8,25 +8,95 @@ PDF Builder
 The :class:`Story` is the base class of the pdf generator. Each story is a list
 of flowables with a page template. The method :meth:`Story.build` generates a
 PDF file in the given output by applying the flowables on the template.
+
+A big story can be built by many processes with the *workers* argument of
+:meth:`Story.build`. The story is cut after its page breaks in chunks built
+separately and concatenated in a single PDF:
+
+>>> story.build(out, u'Report', u'Enix', workers=4,
+...             canvasmaker=NumberedCanvasFactory(-1 * units.cm, 1.5 * units.cm))
+
+The page numbers of a :class:`~pdf_generator.page_number.NumberedCanvasFactory`
+are the ones of the whole document, the pages of each chunk are counted before
+they are rendered. The template, the flowables and the build arguments are
+sent to the worker processes and must be picklable.
+
+A story built with *incremental* keeps the PDF of the pages of the build, cut
+in segments starting on a new page with a flowable of the story. The next
+incremental build reuses the segments whose flowables are unchanged and lays
+out the story again only from the first changed segment until a page starts
+with the flowable, the page template and the page number of a reusable
+segment:
+
+>>> story.build(out, u'Report', u'Enix', incremental=True)
+>>> story[120] = Paragraph(u'Edited paragraph')
+>>> story.build(out, u'Report', u'Enix', incremental=True)
+
+The changes are tracked by the methods of the story, a flowable modified in
+place is marked as changed by setting it again: ``story[120] = story[120]``.
+
+A story built with *streaming* is also rendered by segments, each one is
+written to the output as soon as it's rendered by a
+:class:`~pdf_generator.merge.PDFWriter`. The memory used by the PDF is the one
+of a segment instead of the one of the whole document:
+
+>>> with open('report.pdf', 'wb') as out:
+...     story.build(out, u'Report', u'Enix', streaming=True)
+
+The PDF of the *workers*, *incremental* and *streaming* builds is a
+concatenation of documents that keeps only their pages and meta datas. The
+outlines and the names of their catalogs are dropped: the PDF has no
+bookmarks nor named destinations. An internal link (``<a href="#name">``)
+works only inside its chunk or segment, a link to a destination of another
+one fails the build with the :exc:`ValueError` of reportlab. The stories
+using them are built in a single document.
 """
 
 from __future__ import absolute_import
 
+import io
 import six
+import copy
+import functools
 import collections
+import multiprocessing
 
 from reportlab.platypus import (
     PageBreak,
     FrameBreak,
     NextPageTemplate,
 )
-from pdf_generator.styles import Paragraph
+from reportlab.platypus.doctemplate import _doNothing
+from pdf_generator.styles import (
+    Paragraph,
+    LazyParagraph,
+    frags_cache as process_frags_cache,
+    layout_cache as process_layout_cache,
+)
+from pdf_generator.table import StreamingTable
+from pdf_generator.page_number import CountingCanvas
+from pdf_generator.merge import concatenate, PDFWriter
+from pdf_generator.profiling import instrument
 
 __all__ = [
     'Story',
 ]
 
 
+# The number of flowables given at once to the doc of a segment
+_SEGMENT_WINDOW = 256
+
+_Segment = collections.namedtuple('_Segment', [
+    'flowables',
+    'next_flowable',
+    'first_template',
+    'page_offset',
+    'page_count',
+    'next_template',
+    'pdf',
+])
+
+
 class Story(collections.abc.MutableSequence):
     """
     A list of flowables.
@@ -34,21 +104,31 @@ class Story(collections.abc.MutableSequence):
     The template is a :class:`~pdf_generator.templates.Template` or a derived
     class.
     """
+    #: The number of pages of the segments of the incremental and streaming
+    #: builds
+    segment_pages = 8
+
     def __init__(self, template):
         self._template = template
         self._story = list()
         self._index = 0
+        self._segments = []
+        self._segments_options = None
+        self._changed = set()
 
     @property
     def template(self):
         return self._template
 
-    def append(self, flowable):
+    def append(self, flowable, lazy=False):
         """
         Add *flowable* to the story.
+
+        A string is added as a :class:`~pdf_generator.styles.Paragraph`, or a
+        :class:`~pdf_generator.styles.LazyParagraph` when *lazy* is true.
         """
         if isinstance(flowable, six.string_types):
-            flowable = Paragraph(flowable)
+            flowable = LazyParagraph(flowable) if lazy else Paragraph(flowable)
         super(Story, self).append(flowable)
 
     def next_page(self):
@@ -84,24 +164,354 @@ class Story(collections.abc.MutableSequence):
         return self._story[index]
 
     def insert(self, index, value):
+        self._changed.add(id(value))
         return self._story.insert(index, value)
 
     def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            self._changed.update(id(flowable) for flowable in value)
+        else:
+            self._changed.add(id(value))
         self._story[index] = value
 
     def __delitem__(self, index):
         del self._story[index]
 
     def build(self, out, title, author, debug=False,
-              header=None, footer=None, page_end=None, **kw):
+              header=None, footer=None, page_end=None, workers=None, frags_cache=None, layout_cache=None,
+              incremental=False, profile=None, streaming=False, **kw):
         """
         Renders the template in out.
 
         Out is a file-like object to write the template. The title and author
         are set as meta datas on the generated template. If *debug* is True,
         the outlines of the frames are printed in the PDF.
+
+        When *workers* is given, the story is built by chunks in as many
+        processes. The story is left untouched. When *workers* is 1, the
+        chunks are built in the current process.
+
+        *frags_cache* is a :class:`~pdf_generator.styles.FragsCache` used by
+        the paragraphs parsed during the build, or ``True`` for the cache
+        shared by the builds of the process.
+
+        *layout_cache* is a :class:`~pdf_generator.styles.LayoutCache` used by
+        the paragraphs wrapped during the build, or ``True`` for the cache
+        shared by the builds of the process. The documents built from the
+        same paragraphs reuse their lines instead of breaking them again.
+
+        When *incremental* is true, the pages of the previous incremental
+        build whose flowables did not change are reused, the other ones are
+        laid out again. The output is a concatenation of segments of about
+        :attr:`segment_pages` pages. The page numbers of a canvasmaker
+        numbering the whole document are not supported.
+
+        *profile* is a :class:`~pdf_generator.profiling.BuildProfile`
+        recording the timings of the build.
+
+        When *streaming* is true, the pages are rendered by segments of about
+        :attr:`segment_pages` pages written to *out* as soon as they are
+        rendered. As by the other builds in a single document, the flowables
+        are removed from the story once rendered. A canvasmaker numbering the
+        pages with their total, as the
+        :class:`~pdf_generator.page_number.NumberedCanvasFactory`, makes
+        :meth:`count_pages` lay out the whole story first. The flowables are
+        not drawn by this pass, the paragraphs keep only their height, but
+        the peak memory follows the size of the story instead of the size of
+        a segment.
+
+        The builds with *workers*, *incremental* or *streaming* drop the
+        outlines and the named destinations of their chunks or segments, and
+        fail on the internal links between two of them.
         """
-        doc = self._template(out, title, author, debug,
-                             header=header, footer=footer, page_end=page_end)
+        if profile is not None:
+            with profile:
+                return self.build(out, title, author, debug, header, footer, page_end, workers,
+                                  frags_cache, layout_cache, incremental, streaming=streaming, **kw)
+        if frags_cache is not None:
+            with process_frags_cache if frags_cache is True else frags_cache:
+                return self.build(out, title, author, debug, header, footer, page_end, workers,
+                                  layout_cache=layout_cache, incremental=incremental, streaming=streaming, **kw)
+        if layout_cache is not None:
+            with process_layout_cache if layout_cache is True else layout_cache:
+                return self.build(out, title, author, debug, header, footer, page_end, workers,
+                                  incremental=incremental, streaming=streaming, **kw)
+        if streaming:
+            if workers is not None or incremental:
+                raise ValueError('The streaming build is done in a single process and is not incremental')
+            return self._build_streaming(out, (title, author, debug, header, footer, page_end, kw))
+        if incremental:
+            if workers is not None:
+                raise ValueError('The incremental build is done in a single process')
+            if hasattr(kw.get('canvasmaker'), 'bind'):
+                raise ValueError('The incremental build does not number the pages of the whole document')
+            return self._build_incremental(out, (title, author, debug, header, footer, page_end, kw))
+        if workers is not None:
+            return self._build_chunks(out, title, author, debug, header, footer, page_end, workers, kw)
+
+        doc = instrument(self._template(out, title, author, debug,
+                                        header=header, footer=footer, page_end=page_end))
         doc.build(self._story, **kw)
         return out
+
+    def count_pages(self):
+        """
+        Returns the number of pages of the story.
+
+        The story is laid out on a canvas discarding the output, the story is
+        left untouched. The headers, the footers and the *page_end* callbacks
+        are not called. The paragraphs keep only their height, their lines
+        are broken again by the next build.
+        """
+        return _count_chunk((self._template, self._story, None))
+
+    def get_chunks(self, count):
+        """
+        Splits the story in about *count* chunks starting on a new page.
+
+        Returns a list of tuples of the template, the flowables and the page
+        template of the first page of the chunk, ``None`` for the first one of
+        the template.
+        """
+        size = len(self._story) // count
+        chunks = []
+        start = 0
+        first_template = current_template = None
+        for index, flowable in enumerate(self._story, 1):
+            if isinstance(flowable, NextPageTemplate):
+                current_template = flowable.action[1]
+            elif isinstance(flowable, PageBreak):
+                current_template = flowable.nextTemplate or current_template
+                if index - start >= size:
+                    chunks.append((self._template, self._story[start:index], first_template))
+                    start = index
+                    first_template = current_template
+
+        if start < len(self._story) or not chunks:
+            chunks.append((self._template, self._story[start:], first_template))
+        return chunks
+
+    def _build_chunks(self, out, title, author, debug, header, footer, page_end, workers, kw):
+        chunks = self.get_chunks(workers * 4)
+        pool = multiprocessing.Pool(workers) if workers != 1 else None
+        try:
+            map_ = pool.map if pool else map
+
+            canvasmaker = kw.get('canvasmaker')
+            page_offsets = [0] * len(chunks)
+            if hasattr(canvasmaker, 'bind'):
+                page_counts = list(map_(_count_chunk, chunks))
+                page_offsets = [sum(page_counts[:index]) for index in range(len(chunks))]
+                page_count = sum(page_counts)
+
+            tasks = []
+            for chunk, page_offset in zip(chunks, page_offsets):
+                if hasattr(canvasmaker, 'bind'):
+                    kw = dict(kw, canvasmaker=canvasmaker.bind(page_count, page_offset))
+                tasks.append((chunk, title, author, debug, header, footer, page_end, page_offset, kw))
+
+            pdfs = list(map_(_render_chunk, tasks))
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+        concatenate(pdfs, out)
+        return out
+
+    def _build_incremental(self, out, options):
+        if options != self._segments_options:
+            self._segments = []
+        reusable = dict(((id(segment.flowables[0]) if segment.flowables else None,
+                          segment.first_template, segment.page_offset), segment)
+                        for segment in self._segments)
+
+        def get_reusable(start, first_template, page_offset):
+            flowable = self._story[start] if start < len(self._story) else None
+            segment = reusable.get((id(flowable) if flowable is not None else None, first_template, page_offset))
+            if segment is not None and self._is_unchanged(segment, start):
+                return segment
+            return None
+
+        segments = []
+        start = page_offset = 0
+        first_template = None
+        while not segments or start < len(self._story):
+            segment = get_reusable(start, first_template, page_offset)
+            if segment is None:
+                segment = self._render_segment(start, first_template, page_offset, options, get_reusable)
+            segments.append(segment)
+            start += len(segment.flowables)
+            first_template = segment.next_template
+            page_offset += segment.page_count
+
+        self._segments = segments
+        self._segments_options = options
+        self._changed = set()
+        concatenate([segment.pdf for segment in segments], out)
+        return out
+
+    def _build_streaming(self, out, options):
+        title, author, debug, header, footer, page_end, kw = options
+        canvasmaker = kw.get('canvasmaker')
+        if hasattr(canvasmaker, 'bind'):
+            page_count = self.count_pages()
+
+        writer = PDFWriter(out)
+        page_offset = segments = 0
+        first_template = None
+        while not segments or self._story:
+            if hasattr(canvasmaker, 'bind'):
+                options = options[:-1] + (dict(kw, canvasmaker=canvasmaker.bind(page_count, page_offset)), )
+            segment = self._render_segment(0, first_template, page_offset, options)
+            writer.add(segment.pdf)
+            segments += 1
+            # The rendered flowables are released
+            del self._story[:len(segment.flowables)]
+            first_template = segment.next_template
+            page_offset += segment.page_count
+
+        writer.close()
+        return out
+
+    def _is_unchanged(self, segment, start):
+        end = start + len(segment.flowables)
+        next_flowable = self._story[end] if end < len(self._story) else None
+        return (end <= len(self._story) and next_flowable is segment.next_flowable and
+                all(a is b for a, b in zip(segment.flowables, self._story[start:end])) and
+                not any(id(flowable) in self._changed for flowable in segment.flowables + (next_flowable, )))
+
+    def _render_segment(self, start, first_template, page_offset, options, get_reusable=None):
+        title, author, debug, header, footer, page_end, kw = options
+        out = io.BytesIO()
+        doc = _get_chunk_doc((self._template, None, first_template), out, title, author, debug,
+                             header=header, footer=footer, page_end=page_end, page_offset=page_offset)
+
+        # The flowables are given to the doc by windows, a segment of a long
+        # story does not copy all the remaining flowables.
+        fed = [start]
+        flowables = []
+        end = [len(self._story)]
+        handle_flowable = doc.handle_flowable
+        handle_pageEnd = doc.handle_pageEnd
+
+        def feed():
+            if len(flowables) < _SEGMENT_WINDOW:
+                flowables.extend(self._story[fed[0]:fed[0] + _SEGMENT_WINDOW])
+                fed[0] = min(fed[0] + _SEGMENT_WINDOW, len(self._story))
+
+        def flowable_handled(handled):
+            if handled is flowables:
+                feed()
+            handle_flowable(handled)
+
+        def page_ended():
+            # Stops the build when the next page starts with a flowable of
+            # the story and a new segment is due or an old one can be reused.
+            handle_pageEnd()
+            index = fed[0] - len(flowables)
+            if index < start or not flowables or flowables[0] is not self._story[index] or not _is_page_start(doc):
+                return
+            next_template = doc.pageTemplates.index(doc.pageTemplate)
+            if (doc.page - page_offset >= self.segment_pages or
+                    get_reusable is not None and get_reusable(index, next_template, doc.page) is not None):
+                end[0] = index
+                del flowables[:]
+
+        doc.handle_flowable = flowable_handled
+        doc.handle_pageEnd = page_ended
+        feed()
+        _build_chunk_doc(doc, flowables, **kw)
+
+        next_template = first_template
+        if end[0] < len(self._story):
+            next_template = doc.pageTemplates.index(doc.pageTemplate)
+        return _Segment(tuple(self._story[start:end[0]]),
+                        self._story[end[0]] if end[0] < len(self._story) else None,
+                        first_template, page_offset, doc.page - page_offset, next_template, out.getvalue())
+
+
+def _is_page_start(doc):
+    # The next page of the doc can be the first one of a new doc
+    return not (getattr(doc, '_pageTopFlowables', None) or getattr(doc, '_frameBGs', None) or
+                doc._leftExtraIndent or doc._rightExtraIndent or
+                hasattr(doc, '_nextPageTemplateIndex') or hasattr(doc, '_nextPageTemplateCycle'))
+
+
+def _get_chunk_doc(chunk, out, title, author, debug=False,
+                   header=None, footer=None, page_end=None, page_offset=0, counting=False):
+    template, flowables, first_template = chunk
+    doc = template(out, title, author, debug,
+                   header=header, footer=footer, page_end=page_end)
+
+    if isinstance(first_template, six.string_types):
+        # A cycle of one template, selected by its name
+        doc._firstPageTemplateIndex = [first_template]
+    elif first_template is not None:
+        doc._firstPageTemplateIndex = first_template
+
+    if page_offset:
+        # Called by the doc when it starts, after setting doc.page to 0
+        doc.beforeDocument = functools.partial(setattr, doc, 'page', page_offset)
+    return instrument(doc, counting)
+
+
+def _build_chunk_doc(doc, flowables, **kw):
+    # Like reportlab multiBuild, undo the marks left on the flowables.
+    # The list of flowables is consumed by the build.
+    edits = []
+    doc._multiBuildEdits = edits.append
+    doc.build(flowables, **kw)
+    for edit in edits:
+        edit[0](*edit[1:])
+
+
+def _skip_page_callbacks(doc):
+    # The callbacks of the page templates, as the headers, the footers and
+    # the page_end of the template, are not called
+    for name in ('onFirstPage', 'onLaterPages'):
+        if name in doc.__dict__:
+            setattr(doc, name, _doNothing)
+
+    page_templates = []
+    for page_template in doc.pageTemplates:
+        page_template = copy.copy(page_template)
+        page_template.onPage = page_template.onPageEnd = _doNothing
+        page_templates.append(page_template)
+    doc.pageTemplates[:] = page_templates
+
+
+def _iter_flowables(flowables):
+    # The flowables and the ones they contain, as the content of a
+    # KeepTogether or the cells of a table
+    for flowable in flowables:
+        yield flowable
+        content = getattr(flowable, '_content', None)
+        if isinstance(content, (list, tuple)):
+            for nested in _iter_flowables(content):
+                yield nested
+        for row in getattr(flowable, '_cellvalues', None) or ():
+            for cell in row:
+                for nested in _iter_flowables(cell if isinstance(cell, (list, tuple)) else [cell]):
+                    yield nested
+
+
+def _count_chunk(chunk):
+    if any(isinstance(flowable, StreamingTable) for flowable in _iter_flowables(chunk[1])):
+        raise ValueError('The pages of a story with a StreamingTable cannot be counted, '
+                         'its rows are consumed by the layout')
+
+    doc = _get_chunk_doc(chunk, io.BytesIO(), u'', u'', counting=True)
+    _skip_page_callbacks(doc)
+    _build_chunk_doc(doc, list(chunk[1]), canvasmaker=CountingCanvas)
+    return doc.canv.page_count
+
+
+def _render_chunk(task):
+    chunk, title, author, debug, header, footer, page_end, page_offset, kw = task
+    out = io.BytesIO()
+    doc = _get_chunk_doc(chunk, out, title, author, debug,
+                         header=header, footer=footer, page_end=page_end, page_offset=page_offset)
+    _build_chunk_doc(doc, list(chunk[1]), **kw)
+    return out.getvalue()
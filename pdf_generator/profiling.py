@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Profiling
+=========
+
+:class:`BuildProfile` records where the time of the builds goes. The
+documents built while the profile is used as a context manager, or by
+:meth:`Story.build` with the *profile* argument, are instrumented:
+
+>>> profile = BuildProfile()
+>>> story.build(out, u'Report', u'Enix', profile=profile)
+>>> profile.report()['flowables']['Paragraph']['wrap']
+Timing(count=1240, time=0.52)
+>>> print(profile.format())
+
+The report gives, by type of flowable, the count and the cumulative time of
+the wrap, split and draw made by the frames. The time of a flowable contains
+the time of the flowables it contains, as the cells of a table. The report
+also gives the time of each page, of the headers, of the footers, of the
+other callbacks of the page templates as the *page_end*, of the emission of
+the pages by the canvas, of the save of the canvas and of the whole build.
+The passes counting the pages, as for a numbered streaming build, are only
+recorded as a whole.
+
+With *cprofile*, the builds are also profiled by :mod:`cProfile` and the
+statistics are written by :meth:`BuildProfile.dump_stats` in the format read
+by :mod:`pstats`:
+
+>>> profile = BuildProfile(cprofile=True)
+>>> story.build(out, u'Report', u'Enix', profile=profile)
+>>> profile.dump_stats('build.prof')
+
+The page templates and the frames of the document are instrumented on
+copies, the templates shared between the builds are left untouched. The
+chunks built by other processes with the *workers* of :meth:`Story.build`
+are not recorded.
+"""
+
+from __future__ import absolute_import
+
+import copy
+import time
+import cProfile
+import functools
+import threading
+import collections
+
+from reportlab.platypus.doctemplate import _doNothing
+
+from pdf_generator.templates import PageEndCallback, MarginWriter
+
+__all__ = [
+    'BuildProfile',
+    'Timing',
+    'instrument',
+]
+
+
+_local = threading.local()
+
+Timing = collections.namedtuple('Timing', [
+    'count',
+    'time',
+])
+Timing.__doc__ = """
+The number of calls and their cumulative *time* in seconds.
+"""
+
+_page_callbacks = ('beforeDrawPage', 'onPage', 'afterDrawPage', 'onPageEnd')
+_flowable_methods = (('wrap', 'wrap'), ('drawOn', 'draw'))
+_flowable_timings = ('wrap', 'split', 'draw')
+_report_timings = ('header', 'footer', 'page_end', 'show_page', 'save', 'count', 'build')
+
+
+def _new_timing():
+    return [0, 0.]
+
+
+def _new_flowable_timings():
+    return collections.defaultdict(_new_timing)
+
+
+def _timed(timing, fn):
+    @functools.wraps(fn)
+    def timed(*args, **kw):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kw)
+        finally:
+            timing[0] += 1
+            timing[1] += time.perf_counter() - start
+    return timed
+
+
+def _get_callback_timing_name(callback):
+    writer = getattr(callback, 'fn', callback)
+    if isinstance(writer, MarginWriter):
+        return 'header' if writer.line_y == writer.template.top else 'footer'
+    return 'page_end'
+
+
+def instrument(doc, counting=False):
+    """
+    Instruments the reportlab *doc* with the profile used as a context
+    manager in this thread, if any, and returns it. The *counting* documents
+    only count the pages.
+    """
+    profiles = getattr(_local, 'profiles', None)
+    if profiles:
+        profiles[-1].instrument(doc, counting)
+    return doc
+
+
+class BuildProfile(object):
+    """
+    The timings of the builds of documents.
+
+    When *cprofile* is true, the builds are also profiled by a
+    :class:`cProfile.Profile`.
+    """
+    def __init__(self, cprofile=False):
+        self.profiler = cProfile.Profile() if cprofile else None
+        self.pages = []
+        self._flowables = collections.defaultdict(_new_flowable_timings)
+        self._timings = collections.defaultdict(_new_timing)
+        self._page_start = None
+
+    def __enter__(self):
+        _local.__dict__.setdefault('profiles', []).append(self)
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.profiler is not None:
+            self.profiler.disable()
+        _local.profiles.pop()
+
+    def instrument(self, doc, counting=False):
+        """
+        Records the timings of the build of the reportlab *doc*, only its
+        duration when it's *counting* the pages.
+        """
+        if counting:
+            doc.build = _timed(self._timings['count'], doc.build)
+            return
+
+        doc.build = _timed(self._timings['build'], doc.build)
+        doc.handle_documentBegin = functools.partial(self._begin_document, doc, doc.handle_documentBegin)
+        doc.handle_pageBegin = functools.partial(self._begin_page, doc.handle_pageBegin)
+        doc.handle_pageEnd = functools.partial(self._end_page, doc.handle_pageEnd)
+
+    def _begin_document(self, doc, handle_documentBegin):
+        # The canvas is created, the page templates are added
+        frames = {}
+        doc.pageTemplates[:] = [self._copy_page_template(page_template, frames)
+                                for page_template in doc.pageTemplates]
+        doc.canv.showPage = _timed(self._timings['show_page'], doc.canv.showPage)
+        doc.canv.save = _timed(self._timings['save'], doc.canv.save)
+        handle_documentBegin()
+
+    def _copy_page_template(self, page_template, frames):
+        page_template = copy.copy(page_template)
+        for name in _page_callbacks:
+            callback = page_template.__dict__.get(name, _doNothing)
+            if isinstance(callback, PageEndCallback):
+                # The headers and the footers are timed apart
+                setattr(page_template, name, PageEndCallback(*[
+                    _timed(self._timings[_get_callback_timing_name(fn)], fn) for fn in callback.callbacks]))
+            elif callback is not _doNothing:
+                setattr(page_template, name, _timed(self._timings['page_end'], callback))
+
+        page_template.frames = [frames.get(id(frame)) or frames.setdefault(id(frame), self._copy_frame(frame))
+                                for frame in page_template.frames]
+        return page_template
+
+    def _copy_frame(self, frame):
+        frame = copy.copy(frame)
+        frame.add = functools.partial(self._add, frame.add)
+        frame.split = functools.partial(self._split, frame.split)
+        return frame
+
+    def _add(self, add, flowable, canv, trySplit=0):
+        timings = self._flowables[type(flowable).__name__]
+        instrumented = []
+        for name, kind in _flowable_methods:
+            if name not in flowable.__dict__:
+                setattr(flowable, name, _timed(timings[kind], getattr(flowable, name)))
+                instrumented.append(name)
+        try:
+            return add(flowable, canv, trySplit=trySplit)
+        finally:
+            for name in instrumented:
+                delattr(flowable, name)
+
+    def _split(self, split, flowable, canv):
+        return _timed(self._flowables[type(flowable).__name__]['split'], split)(flowable, canv)
+
+    def _begin_page(self, handle_pageBegin):
+        self._page_start = time.perf_counter()
+        handle_pageBegin()
+
+    def _end_page(self, handle_pageEnd):
+        handle_pageEnd()
+        if self._page_start is not None:
+            self.pages.append(time.perf_counter() - self._page_start)
+            self._page_start = None
+
+    def report(self):
+        """
+        Returns the timings as a dict:
+
+        ``flowables``
+            a dict of the name of the flowable types to a dict of
+            ``'wrap'``, ``'split'`` and ``'draw'`` to a :class:`Timing`.
+        ``pages``
+            the list of the durations of the pages, in seconds.
+        ``header`` and ``footer``
+            the :class:`Timing` of the headers and of the footers.
+        ``page_end``
+            the :class:`Timing` of the other callbacks of the page templates.
+        ``show_page``
+            the :class:`Timing` of the emission of the pages by the canvas.
+        ``save``
+            the :class:`Timing` of the save of the canvas.
+        ``count``
+            the :class:`Timing` of the passes counting the pages.
+        ``build``
+            the :class:`Timing` of the builds.
+        """
+        report = {
+            'flowables': dict((name, dict((kind, Timing(*timings[kind])) for kind in _flowable_timings))
+                              for name, timings in self._flowables.items()),
+            'pages': list(self.pages),
+        }
+        for name in _report_timings:
+            report[name] = Timing(*self._timings[name])
+        return report
+
+    def format(self):
+        """
+        Returns the report as a text table.
+        """
+        report = self.report()
+        lines = [u'{0:<24} {1:>17} {2:>17} {3:>17}'.format(u'flowable', *_flowable_timings)]
+        flowables = sorted(report['flowables'].items(),
+                           key=lambda item: -sum(timing.time for timing in item[1].values()))
+        for name, timings in flowables:
+            lines.append(u'{0:<24} {1} {2} {3}'.format(name, *[
+                u'{0:>7} {1:>8.3f}s'.format(*timings[kind]) for kind in _flowable_timings]))
+
+        pages = report['pages']
+        lines.append(u'{0:<24} {1:>7} {2:>8.3f}s max {3:.3f}s'.format(
+            u'pages', len(pages), sum(pages), max(pages) if pages else 0.))
+        for name in _report_timings:
+            lines.append(u'{0:<24} {1:>7} {2:>8.3f}s'.format(name.replace(u'_', u' '), *report[name]))
+        return u'\n'.join(lines)
+
+    def dump_stats(self, path):
+        """
+        Writes the statistics of :mod:`cProfile` in *path*.
+        """
+        if self.profiler is None:
+            raise ValueError('The profile was created without cprofile')
+        self.profiler.dump_stats(path)
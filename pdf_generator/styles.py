@@ -4,7 +4,12 @@
 
 from __future__ import absolute_import
 
+import os
+import re
 import six
+import threading
+from reportlab.platypus.paragraph import cleanBlockQuotedText
+from reportlab.platypus.flowables import _FUZZ
 from reportlab.platypus import (
     Paragraph as BaseParagraph,
     Image as BaseImage,
@@ -12,10 +17,19 @@ from reportlab.platypus import (
 )
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 
+from pdf_generator.page_number import CountingCanvas
+from pdf_generator.cache import LRUCache
+from pdf_generator.image_size import get_image_size
+
 __all__ = [
     'Paragraph',
+    'LazyParagraph',
+    'get_style',
+    'FragsCache',
+    'LayoutCache',
     'HSpacer',
     'Image',
+    'CachedImage',
     'bold',
     'italic',
 ]
@@ -23,6 +37,178 @@ __all__ = [
 
 styles = getSampleStyleSheet()
 snormal = ParagraphStyle('normal')
+style_cache = LRUCache(maxsize=512)
+_local = threading.local()
+
+# The tags parsed with a state, as the sequences, or drawn by a callback
+_dynamic_tags = re.compile(r'<\s*(seq|ondraw|index)', re.IGNORECASE)
+
+
+def _has_dynamic_tags(*markups):
+    return any(isinstance(markup, six.string_types) and _dynamic_tags.search(markup) is not None
+               for markup in markups)
+
+
+def _get_layout_source(text, bulletText):
+    # The fingerprint of the markup for the LayoutCache, the markups with
+    # dynamic tags give other lines for the same source.
+    if _has_dynamic_tags(text, bulletText):
+        return None
+    return text, bulletText
+
+
+def get_style(parent, **kw):
+    """
+    Returns a :class:`ParagraphStyle` derived from *parent* with the
+    attributes *kw*.
+
+    The styles are shared by the calls with the same parent and the same
+    attributes, they must not be modified. When an attribute is not hashable,
+    a new style is returned.
+    """
+    try:
+        key = (parent, frozenset(kw.items()))
+        style = style_cache.get(key)
+    except TypeError:
+        return ParagraphStyle('style', parent=parent, **kw)
+
+    if style is None:
+        style = style_cache[key] = ParagraphStyle('style', parent=parent, **kw)
+    return style
+
+
+def _clone_frags(frags):
+    if isinstance(frags, list):
+        return [frag.clone() for frag in frags]
+    return frags
+
+
+class FragsCache(LRUCache):
+    """
+    A cache of the parsed markup of the paragraphs.
+
+    The paragraphs created while the cache is used as a context manager look
+    up their markup in the cache, by text, style and bullet text. The
+    fragments are copied for each paragraph. The markup with sequences,
+    ``<onDraw>`` or ``<index>`` tags is parsed for each paragraph, as the
+    sequences are numbered by the parsing.
+
+    >>> cache = FragsCache(maxsize=4096)
+    >>> with cache:
+    ...     rows = [[bold(u'Total'), amount] for amount in amounts]
+    >>> cache.hit_rate
+    0.99
+
+    :meth:`Story.build` uses a cache for the :class:`LazyParagraph` parsed
+    during the build with its *frags_cache* argument. :data:`frags_cache` is
+    a cache shared by the builds of a process.
+    """
+    def __enter__(self):
+        _local.__dict__.setdefault('frags_caches', []).append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.frags_caches.pop()
+
+    def parse(self, paragraph, text, style, bulletText, cleaner):
+        """
+        Sets up the *paragraph* with the parsed markup of *text*.
+        """
+        if _has_dynamic_tags(text, bulletText):
+            BaseParagraph._setup(paragraph, text, style, bulletText, None, cleaner)
+            return
+
+        key = (text, style, bulletText, paragraph.caseSensitive)
+        try:
+            parsed = self.get(key)
+        except TypeError:
+            # An unhashable bullet text
+            BaseParagraph._setup(paragraph, text, style, bulletText, None, cleaner)
+            return
+
+        if parsed is None:
+            BaseParagraph._setup(paragraph, text, style, bulletText, None, cleaner)
+            parsed = (paragraph.text, paragraph.style, _clone_frags(paragraph.frags),
+                      _clone_frags(paragraph.bulletText))
+            self[key] = parsed
+            return
+
+        paragraph.text, paragraph.style, frags, bulletText = parsed
+        paragraph.frags = _clone_frags(frags)
+        paragraph.bulletText = _clone_frags(bulletText)
+        paragraph.debug = 0
+
+
+frags_cache = FragsCache(maxsize=4096)
+
+
+class LayoutCache(LRUCache):
+    """
+    A cache of the lines of the paragraphs broken by their wrap.
+
+    The paragraphs wrapped while the cache is used as a context manager look
+    up their lines in the cache, by fingerprint and available width. The
+    fingerprint of a paragraph is its class, its source text and bullet text,
+    its style and its case sensitivity. The parts of a split paragraph have
+    the fingerprint of the paragraph and of the split.
+
+    >>> cache = LayoutCache(maxsize=4096)
+    >>> for customer in customers:
+    ...     with cache:
+    ...         build_invoice(customer)
+    >>> cache.hit_rate
+    0.95
+
+    :meth:`Story.build` uses a cache with its *layout_cache* argument.
+    :data:`layout_cache` is a cache shared by the builds of a process.
+
+    The styles are compared by identity, the paragraphs with the same text
+    share their lines only when they share their style, as the styles of
+    :func:`get_style`. The lines are shared by the paragraphs and must not be
+    modified. The paragraphs with sequences, ``<onDraw>`` or ``<index>`` tags
+    are not cached, their text depends on the previous paragraphs.
+    """
+    def __enter__(self):
+        _local.__dict__.setdefault('layout_caches', []).append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.layout_caches.pop()
+
+    def wrap(self, paragraph, avail_width, avail_height):
+        """
+        Wraps the *paragraph* in *avail_width*, with the lines of the
+        paragraphs with the same fingerprint if any.
+        """
+        source = paragraph.__dict__.get('_layout_source')
+        if source is None or avail_width < _FUZZ:
+            return BaseParagraph.wrap(paragraph, avail_width, avail_height)
+
+        key = (type(paragraph), source, paragraph.style, paragraph.caseSensitive,
+               paragraph.__dict__.get('autoLeading'), avail_width)
+        try:
+            layout = self.get(key)
+        except TypeError:
+            # An unhashable bullet text
+            return BaseParagraph.wrap(paragraph, avail_width, avail_height)
+
+        paragraph._shared_lines = True
+        if layout is None:
+            width, height = BaseParagraph.wrap(paragraph, avail_width, avail_height)
+            self[key] = (paragraph.blPara, paragraph._wrapWidths, height)
+            return width, height
+
+        paragraph.blPara, wrap_widths, paragraph.height = layout
+        paragraph._wrapWidths = list(wrap_widths)
+        paragraph.width = avail_width
+        return avail_width, paragraph.height
+
+
+layout_cache = LayoutCache(maxsize=4096)
+
+
+# The attributes set by the line breaking of reportlab
+_line_attributes = ('blPara', '_wrapWidths', '_width_max', '_hyphenations', '_splitLongWordCount')
 
 
 class Paragraph(BaseParagraph):
@@ -57,17 +243,67 @@ class Paragraph(BaseParagraph):
     To create a paragraph with an style from the sample stylesheet and additional rules
 
     >>> Paragraph(text, 'h2', color=colors.red)
+
+    The styles created from additional rules are shared by the paragraphs with
+    the same rules, see :func:`get_style`.
     """
     def __init__(self, text, style=snormal, bulletText=None, frags=None, caseSensitive=1, encoding='utf8', **kw):
         if isinstance(style, six.string_types):
             style = styles[style]
 
         if kw:
-            style = ParagraphStyle('style', parent=style, **kw)
+            style = get_style(style, **kw)
 
         BaseParagraph.__init__(self, text, style, bulletText=bulletText, frags=frags,
                                caseSensitive=caseSensitive, encoding=encoding)
 
+    def _setup(self, text, style, bulletText, frags, cleaner):
+        if frags is None:
+            self.__dict__.setdefault('_layout_source', _get_layout_source(text, bulletText))
+
+        caches = getattr(_local, 'frags_caches', None)
+        if not caches or frags is not None:
+            BaseParagraph._setup(self, text, style, bulletText, frags, cleaner)
+        else:
+            caches[-1].parse(self, text, style, bulletText, cleaner)
+
+    def wrap(self, avail_width, avail_height):
+        caches = getattr(_local, 'layout_caches', None)
+        if caches:
+            return caches[-1].wrap(self, avail_width, avail_height)
+        self._shared_lines = False
+        return BaseParagraph.wrap(self, avail_width, avail_height)
+
+    def split(self, avail_width, avail_height):
+        if self.__dict__.get('_shared_lines') and 'blPara' in self.__dict__:
+            # The split modifies the lines, the shared ones are broken again
+            self._shared_lines = False
+            BaseParagraph.wrap(self, self.width, avail_height)
+
+        parts = BaseParagraph.split(self, avail_width, avail_height)
+        source = self.__dict__.get('_layout_source')
+        if source is not None and len(parts) == 2:
+            # The parts are the same for the same lines and the same split
+            split = (source, self.style, tuple(self._wrapWidths), len(parts[0].blPara.lines))
+            for index, part in enumerate(parts):
+                part._layout_source = split + (index, )
+        if isinstance(getattr(self, 'canv', None), CountingCanvas):
+            # The lines are broken again by the next build
+            self._release_lines()
+        return parts
+
+    def _release_lines(self):
+        for name in _line_attributes:
+            self.__dict__.pop(name, None)
+
+    def draw(self):
+        if isinstance(self.canv, CountingCanvas):
+            # Nothing to draw when only the pages are counted, the lines are
+            # broken again by the next build
+            self._release_lines()
+            return
+        BaseParagraph.draw(self)
+
     def __eq__(self, other):
         return (isinstance(other, BaseParagraph) and
                 self.text == other.text and self._same_style(other))
@@ -84,11 +320,76 @@ class Paragraph(BaseParagraph):
         return 'P({})'.format(self.text[:40].encode('ascii', 'ignore'))
 
     def __bool__(self):
+        if self.text is None:
+            # A part of a split paragraph
+            return bool(self.frags)
         return bool(self.text.strip())
 
     __nonzero__ = __bool__
 
 
+def _parsed_attribute(name):
+    # An attribute set by the parsing of the markup of a LazyParagraph
+    def get(self):
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            self._parse()
+            return self.__dict__[name]
+
+    def set(self, value):
+        self.__dict__[name] = value
+
+    return property(get, set)
+
+
+class LazyParagraph(Paragraph):
+    """
+    A :class:`Paragraph` that parses its markup only when it's laid out.
+
+    It takes the same arguments as :class:`Paragraph`. Until its first wrap or
+    split, it only keeps its text and its style. The parsed markup is released
+    once the paragraph is drawn and parsed again if it's laid out again.
+    """
+    _parsed_attributes = ('frags', 'bulletText', 'debug')
+    frags = _parsed_attribute('frags')
+    bulletText = _parsed_attribute('bulletText')
+    debug = _parsed_attribute('debug')
+
+    def __init__(self, text, style=snormal, bulletText=None, frags=None, caseSensitive=1, encoding='utf8', **kw):
+        if frags is not None:
+            # The parts of a split paragraph
+            Paragraph.__init__(self, text, style, bulletText, frags, caseSensitive, encoding, **kw)
+            return
+
+        if isinstance(style, six.string_types):
+            style = styles[style]
+
+        if kw:
+            style = get_style(style, **kw)
+
+        self.caseSensitive = caseSensitive
+        self.encoding = encoding
+        self.style = style
+        self._source = (text, style, bulletText)
+        self._layout_source = _get_layout_source(text, bulletText)
+        self.text = cleanBlockQuotedText(text)
+
+    def _parse(self):
+        text, style, bulletText = self._source
+        self._setup(text, style, bulletText or getattr(style, 'bulletText', None), None, cleanBlockQuotedText)
+
+    def _release(self):
+        for name in self._parsed_attributes + _line_attributes:
+            self.__dict__.pop(name, None)
+        self.style = self._source[1]
+
+    def draw(self):
+        Paragraph.draw(self)
+        if '_source' in self.__dict__ and not isinstance(self.canv, CountingCanvas):
+            self._release()
+
+
 class RotatedParagraph(Paragraph):
     def __init__(self, *args, **kw):
         self.rotation = kw.pop('rotation')
@@ -134,19 +435,60 @@ def HSpacer(width):
     return Spacer(0, width)
 
 
-def Image(path, width=None, height=None, ratio=None, hAlign='CENTER', **kw):
+def Image(path, width=None, height=None, ratio=None, hAlign='CENTER', cache=None, **kw):
     """
     An image with the file at *path*.
 
     The ratio is the width divided by the height of the source image. If the
     width or the height is given with the ratio, the other dimension is
     calculated from the first.
+
+    When a :class:`~pdf_generator.medias.ImageCache` *cache* is given, the
+    image is read from it, decoded once and downsampled to its drawn size.
+
+    The size of the PNG, JPEG and GIF files is read from their headers by
+    :func:`~pdf_generator.image_size.get_image_size`, the image is only read
+    when it's drawn. The size of the other sources, as the URLs, is left to
+    reportlab.
     """
     if width and ratio:
         height = width / ratio
     elif height and ratio:
         width = height * ratio
 
+    if cache is not None:
+        return cache.get_image(path, width, height, hAlign=hAlign, **kw)
+
     image = BaseImage(path, width, height, **kw)
     image.hAlign = hAlign
+
+    if (isinstance(path, six.string_types) and kw.get('kind', 'direct') in ('direct', 'absolute') and
+            not kw.get('useDPI') and os.path.isfile(path)):
+        try:
+            size = get_image_size(path)
+        except (IOError, OSError):
+            size = None
+        if size is not None:
+            # Set before reportlab reads the image to get them
+            image.imageWidth, image.imageHeight = size
+            image.drawWidth = width or size[0]
+            image.drawHeight = height or size[1]
     return image
+
+
+class CachedImage(BaseImage):
+    """
+    An image drawn from the :class:`reportlab.lib.utils.ImageReader`
+    *reader*, shared by the images of the same source.
+
+    The image is decoded once for all the images sharing the reader and
+    they are drawn from the same image XObject.
+    """
+    def __init__(self, reader, width=None, height=None, kind='direct', mask='auto', hAlign='CENTER'):
+        self.hAlign = hAlign
+        self._mask = mask
+        self._drawing = None
+        self._file = self._img = reader
+        self.filename = reader.fileName
+        self._dpi = False
+        self._setup(width, height, kind, 0)
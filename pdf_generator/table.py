@@ -14,6 +14,22 @@ Those methods take a list of styles, used to create a
 :class:`reportlab.platypus.TableStyle` object for the table. Those styles are
 are tuples as defined by :mod:`reportlab`.
 
+:meth:`TableGenerator.get_streaming_table` returns a
+:class:`StreamingTable` whose rows are pulled from an iterator by chunks while
+the table is laid out, the rows of the generator being the header of each
+chunk. The whole table is never kept in memory:
+
+>>> gen = TableGenerator()
+>>> gen.append(['Name', 'Value'])
+>>> story.append(gen.get_streaming_table(iter_datas(), chunk_size=500))
+
+Reportlab computes the widths of the columns by measuring all the cells. On
+long tables, :meth:`TableGenerator.freeze_column_widths` measures a sample of
+the rows once and gives the widths to the tables:
+
+>>> gen.freeze_column_widths(sample=200)
+>>> story.append(gen.get_long_table())
+
 The :class:`Styles` objects and its default instantiation :data:`styles` are
 shortcut to :mod:`reportlab` table styles in a less obnoxious interface.
 
@@ -70,23 +86,56 @@ Example:
 
 from __future__ import absolute_import
 
+import six
+import copy
+import functools
+import itertools
 import collections
 
 from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.platypus import (
     Table,
     LongTable,
+    Flowable,
+    Spacer,
     TableStyle as RootTableStyle,
 )
 
+from pdf_generator.cache import LRUCache
+
 
 __all__ = [
     'TableGenerator',
+    'StreamingTable',
     'TableStyle',
     'styles'
 ]
 
 
+_string_width_cache = LRUCache(maxsize=8192)
+
+
+def _string_width(text, font_name, font_size):
+    key = (text, font_name, font_size)
+    width = _string_width_cache.get(key)
+    if width is None:
+        width = _string_width_cache[key] = stringWidth(text, font_name, font_size)
+    return width
+
+
+def _cell_width(value, font_name, font_size):
+    # The width of the content of a cell, without the paddings
+    if isinstance(value, (list, tuple)):
+        return max([_cell_width(v, font_name, font_size) for v in value] or [0])
+    if isinstance(value, Flowable):
+        return value.minWidth()
+    if value is None:
+        return 0
+    return max(_string_width(line, font_name, font_size)
+               for line in six.text_type(value).split('\n'))
+
+
 class TableGenerator(collections.abc.MutableSequence):
     """
     A Generator of :class:`Table` and :class:`LongTable`.
@@ -123,6 +172,23 @@ class TableGenerator(collections.abc.MutableSequence):
     def insert(self, index, value):
         self.content.insert(index, value)
 
+    def freeze_column_widths(self, sample=100, font_name='Helvetica', font_size=10, padding=12):
+        """
+        Measures the widths of the columns on about *sample* rows of the
+        generator and uses them for the next tables. Returns the widths.
+
+        The rows are sampled evenly, the first one included. A cell longer
+        than the sampled ones overflows its column. The strings are measured
+        with the font *font_name* and *font_size*, *padding* is the sum of
+        the left and right paddings of the cells.
+        """
+        step = max(1, -(-len(self.content) // sample))
+        rows = self.content[::step]
+        widths = [max(_cell_width(value, font_name, font_size) for value in column) + padding
+                  for column in six.moves.zip_longest(*rows)]
+        self.default_kw['colWidths'] = widths
+        return widths
+
     def _build(self, cls, style, kw):
         if style:
             style = RootTableStyle(style, parent=self.base_style)
@@ -155,6 +221,148 @@ class TableGenerator(collections.abc.MutableSequence):
         """
         return self._build(LongTable, style, kw)
 
+    def get_streaming_table(self, rows, *style, **kw):
+        """
+        Returns a :class:`StreamingTable` of the rows of the iterable *rows*,
+        the rows of the generator being the header of the table.
+        """
+        return self._build(functools.partial(StreamingTable, rows), style, kw)
+
+
+def _get_chunk_commands(commands, header_rows, header, last):
+    # The chunks without the header start at the first row of data, the
+    # commands of the header are dropped and the rows of the others shifted.
+    # The commands of the last rows apply only to the last chunk.
+    chunk_commands = []
+    for command in commands:
+        if len(command) < 3 or not isinstance(command[1], (tuple, list)):
+            chunk_commands.append(command)
+            continue
+
+        name, (start_col, start_row), (end_col, end_row) = command[:3]
+        if start_row < 0:
+            if last:
+                chunk_commands.append(command)
+            continue
+        if header:
+            chunk_commands.append(command)
+            continue
+        if 0 <= end_row < header_rows:
+            continue
+
+        start_row = max(start_row - header_rows, 0)
+        if end_row >= 0:
+            end_row -= header_rows
+        chunk_commands.append((name, (start_col, start_row), (end_col, end_row)) + tuple(command[3:]))
+    return chunk_commands
+
+
+class StreamingTable(Flowable):
+    """
+    A table whose rows are pulled from the iterable *rows* by chunks of
+    *chunk_size* rows when it's laid out.
+
+    Each chunk is laid out as a :class:`reportlab.platypus.Table`, with the
+    *header* rows at the top of each frame. The other keywords are given to
+    each table, their styles apply to each chunk. The widths of the columns
+    are the *colWidths* or the ones computed for the first chunk. The style
+    commands of the rows of the header apply to the header of each frame,
+    the ones of the last rows, as ``styles.last_row``, apply only to the
+    last chunk.
+
+    The rows are consumed by the layout: the table can be laid out once, a
+    second layout raises a :class:`ValueError`. The stories containing one
+    cannot count their pages, as for a numbered streaming build.
+    """
+    def __init__(self, rows, header=(), chunk_size=200, colWidths=None, **kw):
+        Flowable.__init__(self)
+        self._rows = iter(rows)
+        self._header = list(header)
+        self._chunk_size = chunk_size
+        self._chunk = None
+        self._pending = None
+        self._new_frame = True
+        self._col_widths = colWidths
+        kw.setdefault('repeatRows', len(self._header))
+        self._kw = kw
+        self._styles = {}
+
+    def _get_chunk(self):
+        return list(itertools.islice(self._rows, self._chunk_size))
+
+    def _get_style(self, header, last):
+        key = (header, last)
+        if key not in self._styles:
+            style = self._kw.get('style')
+            if style is not None:
+                commands = _get_chunk_commands(getattr(style, 'getCommands', lambda: style)(),
+                                               len(self._header), header, last)
+                if isinstance(style, RootTableStyle):
+                    style = copy.copy(style)
+                    style._cmds = commands
+                else:
+                    style = commands
+            self._styles[key] = style
+        return self._styles[key]
+
+    def _get_table(self, rows, avail_width, avail_height, header=True):
+        kw = dict(self._kw, style=self._get_style(header, not self._chunk))
+        if header:
+            table = Table(self._header + rows, colWidths=self._col_widths, **kw)
+        else:
+            kw['repeatRows'] = 0
+            table = Table(rows, colWidths=self._col_widths, **kw)
+
+        table.hAlign = self.hAlign
+        if self._col_widths is None:
+            table.wrap(avail_width, avail_height)
+            self._col_widths = table._colWidths
+        return table
+
+    def wrap(self, avail_width, avail_height):
+        # Never fits: the frame splits it in tables and the rest of the rows.
+        return avail_width, avail_height + 1
+
+    def split(self, avail_width, avail_height):
+        if self._rows is None:
+            raise ValueError('The rows of the StreamingTable were consumed by a previous layout')
+
+        if self._pending is None:
+            if self._chunk is None:
+                self._chunk = self._get_chunk()
+            self._pending, self._chunk = self._chunk, self._get_chunk()
+
+        rows = self._pending
+        if not rows and not self._header:
+            self._rows = None
+            return [Spacer(0, 0)]
+
+        # A chunk following the previous one in the same frame continues its
+        # table without header.
+        header = self._new_frame or not rows
+        table = self._get_table(rows, avail_width, avail_height, header)
+        width, height = table.wrap(avail_width, avail_height)
+        if height <= avail_height:
+            parts = [table]
+        else:
+            parts = table.split(avail_width, avail_height)
+            if not parts:
+                # Not even a row fits, the chunk is laid out in the next frame
+                self._new_frame = True
+                return []
+            if not header:
+                parts[1:] = [self._get_table(rows[parts[0]._nrows:], avail_width, avail_height)]
+
+        # This flowable is never drawn, reportlab would not clear the mark of
+        # a previous postponement.
+        self.__dict__.pop('_postponed', None)
+        self._pending = None
+        self._new_frame = False
+        if not self._chunk:
+            self._rows = None
+            return parts
+        return parts + [self]
+
 
 class FormattedTableGenerator(TableGenerator):
     """
@@ -174,6 +382,10 @@ class FormattedTableGenerator(TableGenerator):
         Name    | Value     | Rate
         value1  |    513.49 |   3%
         value2  |   1016.20 |  43%
+
+    Many rows are added faster by columns with :meth:`extend_columns`:
+
+    >>> ftg.extend_columns([names, values, rates])
     """
     def __init__(self, formats, *args, **kw):
         super(FormattedTableGenerator, self).__init__(*args, **kw)
@@ -187,6 +399,38 @@ class FormattedTableGenerator(TableGenerator):
                      for (f, v) in zip(self.formats, values)]
         super(FormattedTableGenerator, self).append(formatted)
 
+    def extend(self, rows):
+        rows = list(rows)
+        if len(set(len(row) for row in rows)) > 1:
+            # zip(*rows) would truncate the rows to the shortest one
+            for row in rows:
+                self.append(row)
+        else:
+            self.extend_columns(list(zip(*rows)))
+
+    def extend_columns(self, columns):
+        """
+        Appends the rows made of the *columns*, a list of sequences of the same
+        length. The columns may be lists, tuples, :class:`array.array` or
+        numpy arrays.
+        """
+        formatted = []
+        for f, column in zip(self.formats, columns):
+            if hasattr(column, 'tolist'):
+                # Python numbers are formatted faster than numpy scalars
+                column = column.tolist()
+            if f is None:
+                formatted.append(column)
+                continue
+
+            types = set(map(type, column))
+            # The method of the type of a homogeneous column skips the
+            # dispatch of the builtin format
+            formatter = types.pop().__format__ if len(types) == 1 else format
+            formatted.append(map(formatter, column, itertools.repeat(f)))
+
+        self.content.extend(map(list, zip(*formatted)))
+
 
 class TableStyle(RootTableStyle, object):
     def __init__(self, *args):
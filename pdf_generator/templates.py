@@ -61,6 +61,11 @@ The first one is set at the instantiation of the :class:`SimpleTemplate` or
 
 They have a general purpose and can alter the canvas.
 
+The callbacks of the template are compiled once in a single
+:class:`PageEndCallback` used by all the documents without call time
+callbacks. The page templates of a :class:`Template` are also compiled once,
+until a page is added.
+
 Header and footer
 *****************
 
@@ -72,6 +77,10 @@ the call time when the :class:`BaseDocTemplate` is created.
 If a borderColor style is set, a line is also added between the header or
 the footer and the rest of the page.
 
+When the header and the footer are the same on all the pages, the option
+*static_margins* draws them once per document in a form XObject referenced
+by each page, instead of wrapping and drawing them on each page.
+
 
 >>> t = SimpleTemplate(margins=(50, 10),
 ...               header=Paragraph('header header',
@@ -128,6 +137,75 @@ def noop(canvas, doc):
     pass
 
 
+class SavedStateCallback(object):
+    """
+    Callback for page_end calling *fn* between a save and a restore of the
+    state of the canvas.
+    """
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __call__(self, canvas, doc):
+        canvas.saveState()
+        self.fn(canvas, doc)
+        canvas.restoreState()
+
+
+class PageEndCallback(object):
+    """
+    Callback for page_end calling each of the *callbacks* in order.
+    """
+    def __init__(self, *callbacks):
+        self.callbacks = callbacks
+
+    def __call__(self, canvas, doc):
+        for callback in self.callbacks:
+            callback(canvas, doc)
+
+
+class MarginWriter(object):
+    """
+    Callback for page_end writing the paragraph *p* in a margin of the
+    *template*.
+    """
+    def __init__(self, template, margin, line_y, text_y, p):
+        self.template = template
+        self.margin = margin
+        self.line_y = line_y
+        self.text_y = text_y
+        self.p = p
+
+    def __call__(self, canvas, doc):
+        p, template = self.p, self.template
+        w, h = p.wrapOn(canvas, template.printable_width, self.margin)
+
+        canvas.saveState()
+        canvas.setStrokeColor(p.style.textColor)
+        p.drawOn(canvas, (template.printable_width - w) / 2, self.text_y + (self.margin - h) / 2)
+
+        if p.style.borderColor is not None:
+            canvas.setStrokeColor(p.style.borderColor)
+            canvas.line(template.left, self.line_y, template.right, self.line_y)
+
+        canvas.restoreState()
+
+
+class FormMarginWriter(MarginWriter):
+    """
+    Callback for page_end writing the paragraph *p* in a margin of the
+    *template* once per document in a form XObject, drawn by each page.
+    """
+    def __call__(self, canvas, doc):
+        forms = canvas.__dict__.setdefault('_pdf_generator_margin_forms', {})
+        name = forms.get(self)
+        if name is None:
+            name = forms[self] = 'pdf_generator-margin-{0}'.format(len(forms))
+            canvas.beginForm(name)
+            super(FormMarginWriter, self).__call__(canvas, doc)
+            canvas.endForm()
+        canvas.doForm(name)
+
+
 class Fraction(object):
     """
     Fraction of *ratio*.
@@ -161,7 +239,9 @@ class Fraction(object):
 
 
 class BaseTemplate(object):
-    def __init__(self, pagesize=None, margins=None, page_end=None, header=None, footer=None):
+    def __init__(self, pagesize=None, margins=None, page_end=None, header=None, footer=None,
+                 static_margins=False):
+        self.static_margins = static_margins
         self.width, self.height = pagesize or pagesizes.A4
         margins = margins or (36, 36, 18)
         self._mtop, self._mright, self._mbottom, self._mleft = self.explode(margins)
@@ -176,33 +256,28 @@ class BaseTemplate(object):
         self._page_end = self._wraps_page_end(page_end)
         self._header = self._get_top_write_margin_callback(header)
         self._footer = self._get_bottom_write_margin_callback(footer)
+        self._compiled_page_end = None
 
     def _wraps_page_end(self, fn):
         if fn is None:
             return noop
-
-        def wrapped_page_end(canvas, doc):
-            canvas.saveState()
-            fn(canvas, doc)
-            canvas.restoreState()
-        return wrapped_page_end
+        return SavedStateCallback(fn)
 
     def get_page_end(self, page_end_fn=None, header=None, footer=None):
-        page_end_fn = self._wraps_page_end(page_end_fn)
-
-        footer_callback = self._get_bottom_write_margin_callback(footer)
-        header_callback = self._get_top_write_margin_callback(header)
-
-        def page_end(canvas, doc):
-            self._page_end(canvas, doc)
-            self._header(canvas, doc)
-            self._footer(canvas, doc)
-
-            page_end_fn(canvas, doc)
-            footer_callback(canvas, doc)
-            header_callback(canvas, doc)
+        if page_end_fn is None and header is None and footer is None:
+            if self._compiled_page_end is None:
+                self._compiled_page_end = self._get_page_end(noop, noop, noop)
+            return self._compiled_page_end
+
+        return self._get_page_end(
+            self._wraps_page_end(page_end_fn),
+            self._get_bottom_write_margin_callback(footer),
+            self._get_top_write_margin_callback(header),
+        )
 
-        return page_end
+    def _get_page_end(self, *callbacks):
+        callbacks = (self._page_end, self._header, self._footer) + callbacks
+        return PageEndCallback(*[callback for callback in callbacks if callback is not noop])
 
     def _get_bottom_write_margin_callback(self, footer):
         return self._get_write_margin_callback(self._mbottom, self.bottom, 0, footer)
@@ -213,20 +288,8 @@ class BaseTemplate(object):
     def _get_write_margin_callback(self, margin, line_y, text_y, p):
         if p is None:
             return noop
-
-        def write_margin(canvas, doc):
-            w, h = p.wrapOn(canvas, self.printable_width, margin)
-
-            canvas.saveState()
-            canvas.setStrokeColor(p.style.textColor)
-            p.drawOn(canvas, (self.printable_width - w) / 2, text_y + (margin - h) / 2)
-
-            if p.style.borderColor is not None:
-                canvas.setStrokeColor(p.style.borderColor)
-                canvas.line(self.left, line_y, self.right, line_y)
-
-            canvas.restoreState()
-        return self._wraps_page_end(write_margin)
+        writer_class = FormMarginWriter if self.static_margins else MarginWriter
+        return self._wraps_page_end(writer_class(self, margin, line_y, text_y, p))
 
     def explode(self, margins):
         """
@@ -436,6 +499,10 @@ class Template(BaseTemplate):
     """
     A template composed of frames.
     """
+    def __init__(self, *args, **kw):
+        super(Template, self).__init__(*args, **kw)
+        self._compiled_page_templates = None
+
     def _resolve_dim(self, dim, ref):
         if dim is None:
             return ref
@@ -502,6 +569,7 @@ class Template(BaseTemplate):
         pt = PageTemplateSpec(id, frames)
 
         self.page_templates.append(pt)
+        self._compiled_page_templates = None
         return pt
 
     def add_whole_page(self, id=None, padding=None):
@@ -510,13 +578,27 @@ class Template(BaseTemplate):
         """
         return self.add_page(id, [(0, 0, None, None)], padding)
 
+    def get_page_templates(self, page_end=None, header=None, footer=None):
+        """
+        Returns the :class:`PageTemplate` of the pages, ending with the
+        callbacks of :meth:`get_page_end`.
+        """
+        if page_end is None and header is None and footer is None:
+            if self._compiled_page_templates is None:
+                self._compiled_page_templates = self._get_page_templates(self.get_page_end())
+            return self._compiled_page_templates
+
+        return self._get_page_templates(self.get_page_end(page_end, header, footer))
+
+    def _get_page_templates(self, page_end):
+        return [PageTemplate(*pts, onPageEnd=page_end) for pts in self.page_templates]
+
     def __call__(self, out, title, author, debug=False,
                  page_end=None, header=None, footer=None):
-        page_end = self.get_page_end(page_end, header, footer)
         return BaseDocTemplate(
             out,
             pagesize=self.pagesize,
-            pageTemplates=[PageTemplate(*pts, onPageEnd=page_end) for pts in self.page_templates],
+            pageTemplates=self.get_page_templates(page_end, header, footer),
             title=title,
             author=author,
             rightMargin=self._mright,
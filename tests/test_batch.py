@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import mock
+import shutil
+import tempfile
+import unittest
+
+from pdf_generator import Paragraph
+from pdf_generator.styles import FragsCache
+from pdf_generator.templates import SimpleTemplate
+from pdf_generator.batch import RenderJob, render_many
+
+
+def flowables():
+    return [Paragraph(u'Invoice', 'h1'), u'Total: 12']
+
+
+def failing():
+    raise ValueError('No invoice')
+
+
+class TestRenderMany(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.template = SimpleTemplate(header=Paragraph(u'Header'))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def job(self, name, factory=flowables):
+        return RenderJob(self.template, factory, os.path.join(self.dir, name), u'Title', u'Author')
+
+    def check(self, workers):
+        jobs = [self.job('a.pdf'), self.job('b.pdf', failing), self.job('c.pdf')]
+        results = list(render_many(jobs, workers=workers))
+
+        self.assertEqual([r.index for r in results], [0, 1, 2])
+        self.assertEqual([r.out for r in results], [j.out for j in jobs])
+        self.assertIsNone(results[0].error)
+        self.assertIn('No invoice', results[1].error)
+        self.assertIsNone(results[2].error)
+
+        with open(jobs[2].out, 'rb') as pdf:
+            self.assertTrue(pdf.read().startswith(b'%PDF'))
+
+    def test_serial(self):
+        self.check(1)
+
+    def test_pool(self):
+        self.check(2)
+
+    def test_unpicklable(self):
+        results = list(render_many([self.job('a.pdf', lambda: [])], workers=2))
+        self.assertIsNotNone(results[0].error)
+
+    def test_frags_cache(self):
+        jobs = [RenderJob(self.template, flowables, os.path.join(self.dir, name), u'Title', u'Author',
+                          {'frags_cache': True})
+                for name in ['a.pdf', 'b.pdf']]
+        with mock.patch('pdf_generator.batch.process_frags_cache', FragsCache()) as cache:
+            results = list(render_many(jobs, workers=1))
+
+        self.assertEqual([r.error for r in results], [None, None])
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
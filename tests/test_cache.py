@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pdf_generator.cache import LRUCache, DirectoryCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = LRUCache(maxsize=2)
+        self.cache['a'] = 1
+        self.cache['b'] = 2
+
+    def test_get(self):
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('c', 3), 3)
+
+    def test_evict(self):
+        self.cache['c'] = 3
+        self.assertNotIn('a', self.cache)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_evict_least_recently_used(self):
+        self.cache.get('a')
+        self.cache['c'] = 3
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+
+    def test_hit_rate(self):
+        self.assertEqual(self.cache.hit_rate, 0)
+        self.cache.get('a')
+        self.cache.get('c')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(self.cache.hit_rate, .5)
+
+    def test_clear(self):
+        self.cache.get('a')
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.hits, 0)
+
+
+class TestDirectoryCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = DirectoryCache(2, self.directory)
+        self.cache.suffix = '.data'
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_store(self):
+        self.cache._store('key', b'data')
+        self.assertEqual(os.listdir(self.directory), ['key.data'])
+        self.assertEqual(self.cache._load('key'), b'data')
+
+    def test_missing(self):
+        self.assertIsNone(self.cache._load('key'))
+
+    def test_no_directory(self):
+        cache = DirectoryCache(2)
+        cache._store('key', b'data')
+        self.assertIsNone(cache._load('key'))
+
+    def test_hit_rate(self):
+        self.cache._memory['a'] = 1
+        self.cache._memory.get('a')
+        self.cache._memory.get('b')
+        self.assertEqual(self.cache.hit_rate, .5)
@@ -1,11 +1,25 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import io
+import os
+import shutil
+import tempfile
 import unittest
 import mock
 
 from pdf_generator import Paragraph
-from pdf_generator.from_html import Parser, table_style_center
+from pdf_generator.from_html import (
+    Parser,
+    HTMLCache,
+    table_style_center,
+    html_to_rlab,
+    html_to_rlab_many,
+    iter_html_flowables,
+    find_medias,
+    parse_events,
+    parse_many,
+)
 from reportlab import platypus
 
 
@@ -129,3 +143,175 @@ class TestParser(unittest.TestCase):
             Paragraph('pif', bulletText='-'),
             Image.return_value,
         ]])
+
+    def test_paragraph_text_image(self):
+        with mock.patch('pdf_generator.from_html.Image') as Image:
+            parsed = self.parse(u'<p>first</p><p>text<img src="image.png" /></p><p>last</p>')
+
+        self.assertEqual(parsed, [
+            Paragraph('first'),
+            Paragraph('text'),
+            Image.return_value,
+            Paragraph('last'),
+        ])
+
+    def test_unknown_tags(self):
+        self.assertEqual(self.parse(u'<p><u>under</u> <sub>2</sub></p><p>next</p>'), [
+            Paragraph('<u>under</u> <sub>2</sub>'),
+            Paragraph('next'),
+        ])
+
+    def test_handlers(self):
+        self.assertEqual(self.p._start['strong'], self.p.handlers_start.strong)
+        self.assertNotIn('get_handlers', self.p._end)
+        self.assertNotIn('flat', self.p._end)
+        self.assertNotIn('_center', self.p._end)
+
+
+class TestFlatParser(unittest.TestCase):
+    def setUp(self):
+        self.p = Parser(mock.Mock(), mock.Mock(), flat=True)
+
+    def parse(self, text):
+        self.p.feed(text)
+        return self.p.get_result()
+
+    def test_center(self):
+        with mock.patch('pdf_generator.from_html.Image') as Image:
+            parsed = self.parse(u'<center><h1>Title</h1><img src="image.png" /></center>')
+
+        self.assertEqual(parsed, [[
+            Paragraph('Title', 'h1', alignment=1),
+            Image.return_value,
+        ]])
+        self.assertEqual(Image.return_value.hAlign, 'CENTER')
+
+    def test_html_to_rlab(self):
+        self.assertEqual(html_to_rlab(u'<h1>Title</h1><ul><li>pif</li></ul>', flat=True), [
+            Paragraph('Title', 'h1'),
+            Paragraph('pif', bulletText='-'),
+        ])
+
+
+class TestIterHtmlFlowables(unittest.TestCase):
+    html = (u'<h1>Title</h1><p>Text <strong>strong</strong> also</p>'
+            u'<ul><li>pif</li><li>paf</li></ul>trailing text')
+
+    def test_flowables(self):
+        self.assertEqual(list(iter_html_flowables(io.StringIO(self.html), chunk_size=7)), [
+            Paragraph('Title', 'h1'),
+            Paragraph('Text <b>strong</b> also'),
+            Paragraph('pif', bulletText='-'),
+            Paragraph('paf', bulletText='-'),
+            Paragraph('trailing text'),
+        ])
+
+    def test_incremental(self):
+        stream = io.StringIO(self.html)
+        flowables = iter_html_flowables(stream, chunk_size=16)
+        self.assertEqual(next(flowables), Paragraph('Title', 'h1'))
+        self.assertEqual(stream.tell(), 16)
+
+    def test_incremental_image(self):
+        stream = io.StringIO(u'<p>a<img src="image.png" />b</p>' + u'<p>Text</p>' * 50)
+        with mock.patch('pdf_generator.from_html.Image') as Image:
+            flowables = iter_html_flowables(stream, mock.Mock(), chunk_size=64)
+            self.assertEqual(next(flowables), Paragraph('a'))
+            self.assertEqual(stream.tell(), 64)
+            self.assertEqual(next(flowables), Image.return_value)
+            self.assertEqual(next(flowables), Paragraph('b'))
+            self.assertEqual(next(flowables), Paragraph('Text'))
+            self.assertEqual(stream.tell(), 64)
+
+    def test_link_handler(self):
+        flowables = iter_html_flowables(io.StringIO(u'<a href="/index.html">Index</a>'),
+                                        link_handler=u'http://example.com')
+        self.assertEqual(list(flowables), [Paragraph('<link href="http://example.com/index.html">Index</link>')])
+
+
+class TestHTMLCache(unittest.TestCase):
+    html = (u'<h1>Title</h1><p>Text <strong>strong</strong> <font color="red">font</font></p>'
+            u'<center><p>centered</p></center><ul><li>pif<br>paf</li></ul>')
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_replay(self):
+        expected = html_to_rlab(self.html, flat=True)
+        self.assertEqual(html_to_rlab(self.html, flat=True, cache=HTMLCache()), expected)
+
+    def test_table(self):
+        parsed = html_to_rlab(self.html, cache=HTMLCache())
+        self.assertIsInstance(parsed, platypus.Table)
+
+    def test_hit(self):
+        cache = HTMLCache()
+        with mock.patch('pdf_generator.from_html.parse_events', side_effect=parse_events) as parse:
+            first = html_to_rlab(self.html, flat=True, cache=cache)
+            second = html_to_rlab(self.html, flat=True, cache=cache)
+
+        parse.assert_called_once_with(self.html)
+        self.assertEqual(first, second)
+        self.assertIsNot(first[0], second[0])
+        self.assertEqual(cache.hit_rate, .5)
+
+    def test_directory(self):
+        HTMLCache(directory=self.directory).get_events(self.html)
+        with mock.patch('pdf_generator.from_html.parse_events') as parse:
+            events = HTMLCache(directory=self.directory).get_events(self.html)
+
+        self.assertFalse(parse.called)
+        self.assertEqual(events, parse_events(self.html))
+
+    def test_directory_corrupted(self):
+        cache = HTMLCache(directory=self.directory)
+        cache.get_events(self.html)
+        for name in os.listdir(self.directory):
+            with open(os.path.join(self.directory, name), 'wb') as corrupted:
+                corrupted.write(b'corrupted')
+
+        events = HTMLCache(directory=self.directory).get_events(self.html)
+        self.assertEqual(events, parse_events(self.html))
+
+    def test_directory_unexpected(self):
+        cache = HTMLCache(directory=self.directory)
+        cache.get_events(self.html)
+        for name in os.listdir(self.directory):
+            with open(os.path.join(self.directory, name), 'w') as unexpected:
+                unexpected.write('[["start", "p"], 1]')
+
+        events = HTMLCache(directory=self.directory).get_events(self.html)
+        self.assertEqual(events, parse_events(self.html))
+
+
+class TestHtmlToRlabMany(unittest.TestCase):
+    texts = [u'<h1>Card {0}</h1><p>Description <em>{0}</em></p>'.format(x) for x in range(5)]
+
+    def test_parse_many(self):
+        self.assertEqual(parse_many(self.texts, workers=2), [parse_events(text) for text in self.texts])
+
+    def test_parse_many_serial(self):
+        with mock.patch('pdf_generator.from_html.multiprocessing') as multiprocessing:
+            self.assertEqual(parse_many(self.texts, workers=1), [parse_events(text) for text in self.texts])
+        self.assertFalse(multiprocessing.Pool.called)
+
+    def test_html_to_rlab_many(self):
+        self.assertEqual(html_to_rlab_many(self.texts, flat=True, workers=2),
+                         [html_to_rlab(text, flat=True) for text in self.texts])
+
+    def test_table(self):
+        tables = html_to_rlab_many(self.texts, workers=1)
+        self.assertEqual([type(table) for table in tables], [platypus.Table] * 5)
+
+
+class TestFindMedias(unittest.TestCase):
+    def test_find_medias(self):
+        self.assertEqual(find_medias(
+            u'<p><IMG width=3 src=a.png>text</p><img src=\'b c.png\'/><img alt="x" src="/d?x=1&amp;y=2" />'),
+            [u'a.png', u'b c.png', u'/d?x=1&y=2'])
+
+    def test_not_img(self):
+        self.assertEqual(find_medias(u'<imgs src="a.png" /><img data-src="b.png" />'), [])
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import mock
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image as PILImage
+
+from pdf_generator.image_size import get_image_size, read_image_size
+
+
+class TestReadImageSize(unittest.TestCase):
+    def read(self, image_format, **kw):
+        image = io.BytesIO()
+        PILImage.new('RGB', (123, 45)).save(image, image_format, **kw)
+        image.seek(0)
+        return read_image_size(image)
+
+    def test_png(self):
+        self.assertEqual(self.read('PNG'), (123, 45))
+
+    def test_gif(self):
+        self.assertEqual(self.read('GIF'), (123, 45))
+
+    def test_jpeg(self):
+        self.assertEqual(self.read('JPEG'), (123, 45))
+
+    def test_jpeg_progressive_profile(self):
+        self.assertEqual(self.read('JPEG', progressive=True, icc_profile=b'x' * 3000), (123, 45))
+
+    def test_unknown(self):
+        self.assertIsNone(self.read('BMP'))
+
+    def test_truncated(self):
+        self.assertIsNone(read_image_size(io.BytesIO(b'\xff\xd8\xff\xe0\x00\x10JFIF')))
+
+
+class TestGetImageSize(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'image.png')
+        PILImage.new('RGB', (20, 10)).save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cached(self):
+        self.assertEqual(get_image_size(self.path), (20, 10))
+        with mock.patch('pdf_generator.image_size.read_image_size') as read:
+            self.assertEqual(get_image_size(self.path), (20, 10))
+        self.assertFalse(read.called)
+
+    def test_modified(self):
+        self.assertEqual(get_image_size(self.path), (20, 10))
+        PILImage.new('RGB', (30, 10)).save(self.path)
+        os.utime(self.path, (0, 0))
+        self.assertEqual(get_image_size(self.path), (30, 10))
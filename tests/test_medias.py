@@ -1,9 +1,27 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import io
+import os
+import mock
+import shutil
+import tempfile
 import unittest
 
-from pdf_generator.medias import PathMediasLocator
+from PIL import Image as PILImage
+from reportlab import rl_config
+
+from pdf_generator import Story, SimpleTemplate
+from pdf_generator.from_html import html_to_rlab
+from pdf_generator.styles import Image, CachedImage
+from pdf_generator.medias import (
+    PathMediasLocator,
+    DebugMediasLocator,
+    CachedMediasLocator,
+    PrefetchMediasLocator,
+    ImageCache,
+    PLACEHOLDER,
+)
 
 
 class TestPML(unittest.TestCase):
@@ -15,3 +33,133 @@ class TestPML(unittest.TestCase):
 
     def test_locate_relative(self):
         self.assertEqual(self.pml('path/resource'), '/path/to/base/path/resource')
+
+
+class TestImageCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'logo.png')
+        PILImage.new('RGB', (1000, 500), (200, 20, 20)).save(self.path)
+        self.cache = ImageCache(dpi=144)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_downsampled(self):
+        image = self.cache.get_image(self.path, 100, 50)
+        self.assertEqual((image.drawWidth, image.drawHeight), (100, 50))
+        self.assertEqual(image._img.getSize(), (200, 100))
+
+    def test_source_size(self):
+        image = self.cache.get_image(self.path, height=50)
+        self.assertEqual((image.drawWidth, image.drawHeight), (1000, 50))
+        self.assertEqual(image._img.getSize(), (1000, 100))
+
+    def test_not_upsampled(self):
+        image = self.cache.get_image(self.path)
+        self.assertEqual((image.drawWidth, image.drawHeight), (1000, 500))
+        self.assertEqual(image._img.fileName, self.path)
+
+    def test_shared(self):
+        first = self.cache.get_image(self.path, 100, 50)
+        second = self.cache.get_image(self.path, 100, 50)
+        self.assertIsNot(first, second)
+        self.assertIs(first._img, second._img)
+        self.assertEqual(self.cache.hit_rate, .5)
+
+    def test_modified(self):
+        first = self.cache.get_image(self.path, 100, 50)
+        os.utime(self.path, (0, 0))
+        self.assertIsNot(self.cache.get_image(self.path, 100, 50)._img, first._img)
+
+    def test_directory(self):
+        ImageCache(dpi=144, directory=self.directory).get_image(self.path, 100, 50)
+        with mock.patch.object(ImageCache, '_resize') as resize:
+            image = ImageCache(dpi=144, directory=self.directory).get_image(self.path, 100, 50)
+        self.assertFalse(resize.called)
+        self.assertEqual(image._img.getSize(), (200, 100))
+
+    def test_single_xobject(self):
+        story = Story(SimpleTemplate())
+        for x in range(3):
+            story.append(Image(self.path, 100, 50, cache=self.cache))
+
+        out = io.BytesIO()
+        with mock.patch.object(rl_config, 'pageCompression', 0):
+            story.build(out, u'Title', u'Author')
+        self.assertEqual(out.getvalue().count(b'/Subtype /Image'), 1)
+
+    def test_file_like(self):
+        with open(self.path, 'rb') as source:
+            data = source.read()
+        first = self.cache.get_image(io.BytesIO(data), 100, 50)
+        second = self.cache.get_image(io.BytesIO(data), 100, 50)
+        self.assertIs(first._img, second._img)
+        self.assertEqual(first._img.getSize(), (200, 100))
+
+    def test_file_like_not_upsampled(self):
+        with open(self.path, 'rb') as source:
+            image = self.cache.get_image(io.BytesIO(source.read()))
+        self.assertEqual(image._img.getSize(), (1000, 500))
+
+    def test_locator(self):
+        locator = CachedMediasLocator(PathMediasLocator(self.directory), self.cache)
+        image, = html_to_rlab(u'<img src="/logo.png" width="100" height="50" />', locator, flat=True)
+        self.assertIsInstance(image, CachedImage)
+        self.assertEqual(image._img.getSize(), (200, 100))
+
+
+class TestPrefetchMediasLocator(unittest.TestCase):
+    def setUp(self):
+        self.fetch = mock.Mock(side_effect=lambda path: path.encode('utf-8'))
+        self.locator = PrefetchMediasLocator(PathMediasLocator('/base'), workers=2, fetch=self.fetch)
+
+    def tearDown(self):
+        self.locator.close()
+
+    def test_prefetch(self):
+        self.locator.prefetch(['a.png', '/b.png', 'a.png'])
+        self.assertEqual(self.locator('b.png').read(), b'/base/b.png')
+        self.assertEqual(self.locator('a.png').read(), b'/base/a.png')
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_not_prefetched(self):
+        self.assertEqual(self.locator('c.png').read(), b'/base/c.png')
+
+    def test_error(self):
+        self.fetch.side_effect = IOError('No such file')
+        self.locator.prefetch(['a.png'])
+        self.assertRaises(IOError, self.locator, 'a.png')
+
+    def test_placeholder(self):
+        locator = PrefetchMediasLocator(DebugMediasLocator(), fetch=self.fetch)
+        locator.prefetch(['a.png'])
+        self.assertIs(locator('a.png'), PLACEHOLDER)
+        self.assertFalse(self.fetch.called)
+
+    def test_html_to_rlab(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        PILImage.new('RGB', (20, 10)).save(os.path.join(directory, 'logo.png'))
+
+        locator = PrefetchMediasLocator(PathMediasLocator(directory))
+        with mock.patch.object(locator, 'prefetch', wraps=locator.prefetch) as prefetch:
+            image, = html_to_rlab(u'<p><img src="/logo.png" /></p>', locator, flat=True)
+        prefetch.assert_called_once_with([u'/logo.png'])
+        self.assertEqual((image.drawWidth, image.drawHeight), (20, 10))
+
+    def test_cached(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        PILImage.new('RGB', (1000, 500)).save(os.path.join(directory, 'logo.png'))
+
+        prefetch = PrefetchMediasLocator(PathMediasLocator(directory))
+        self.addCleanup(prefetch.close)
+        locator = CachedMediasLocator(prefetch, ImageCache(dpi=144))
+        with mock.patch.object(prefetch, 'prefetch', wraps=prefetch.prefetch) as prefetched:
+            first, second = html_to_rlab(u'<img src="/logo.png" width="100" height="50" />' * 2,
+                                         locator, flat=True)
+        prefetched.assert_called_once_with([u'/logo.png', u'/logo.png'])
+        self.assertIsInstance(first, CachedImage)
+        self.assertIs(first._img, second._img)
+        self.assertEqual(first._img.getSize(), (200, 100))
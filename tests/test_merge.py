@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import unittest
+
+from reportlab.pdfgen.canvas import Canvas
+from pdf_generator.merge import concatenate, PDFWriter, _PDF
+
+
+def render(pages, title):
+    out = io.BytesIO()
+    canvas = Canvas(out, pageCompression=0)
+    canvas.setTitle(title)
+    for x in range(pages):
+        canvas.drawString(10, 10, u'{0} {1}'.format(title, x))
+        canvas.showPage()
+    canvas.save()
+    return out.getvalue()
+
+
+class TestConcatenate(unittest.TestCase):
+    def setUp(self):
+        out = io.BytesIO()
+        concatenate([render(2, u'first'), render(3, u'second')], out)
+        self.pdf = out.getvalue()
+
+    def test_pages(self):
+        pdf = _PDF(self.pdf)
+        self.assertEqual(len(pdf.pages), 5)
+
+    def test_page_order(self):
+        self.assertLess(self.pdf.index(b'(first 1)'), self.pdf.index(b'(second 0)'))
+
+    def test_meta_datas(self):
+        pdf = _PDF(self.pdf)
+        self.assertIn(b'/Title (first)', pdf.objects[pdf.info])
+        self.assertNotIn(b'/Title (second)', self.pdf)
+
+    def test_empty(self):
+        self.assertRaises(ValueError, concatenate, [], io.BytesIO())
+
+    def test_not_pdf(self):
+        self.assertRaises(ValueError, concatenate, [b'text'], io.BytesIO())
+
+
+class TestPDFWriter(unittest.TestCase):
+    def setUp(self):
+        self.out = io.BytesIO()
+        self.writer = PDFWriter(self.out)
+
+    def test_streamed(self):
+        self.writer.add(render(2, u'first'))
+        self.assertIn(b'(first 1)', self.out.getvalue())
+        self.assertNotIn(b'xref', self.out.getvalue())
+
+        self.writer.add(render(3, u'second'))
+        self.writer.close()
+        self.assertEqual(len(_PDF(self.out.getvalue()).pages), 5)
+
+    def test_shared_objects(self):
+        self.writer.add(render(2, u'first'))
+        self.writer.add(render(3, u'second'))
+        self.writer.close()
+        self.assertEqual(self.out.getvalue().count(b'/BaseFont /Helvetica'), 1)
+
+    def test_empty(self):
+        self.assertRaises(ValueError, self.writer.close)
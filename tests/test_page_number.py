@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import mock
+import unittest
+
+from reportlab import rl_config
+from pdf_generator import Story, SimpleTemplate
+from pdf_generator.page_number import (
+    NumberedCanvasFactory,
+    NumberedCanvas,
+    BoundNumberedCanvas,
+    CountingCanvas,
+)
+
+
+class TestNumberedCanvasFactory(unittest.TestCase):
+    def render(self, factory, pages=3):
+        out = io.BytesIO()
+        canvas = factory(out, pagesize=(200, 300), pageCompression=0)
+        for x in range(pages):
+            canvas.drawString(10, 10, 'page')
+            canvas.showPage()
+        canvas.save()
+        return canvas, out.getvalue()
+
+    def test_buffered(self):
+        canvas, pdf = self.render(NumberedCanvasFactory(-10, 10, '{0}/{1}'))
+        self.assertIsInstance(canvas, NumberedCanvas)
+        self.assertIn(b'(1/3)', pdf)
+        self.assertIn(b'(3/3)', pdf)
+
+    def test_bind(self):
+        factory = NumberedCanvasFactory(-10, 10)
+        bound = factory.bind(3)
+        self.assertIsNone(factory.page_count)
+        self.assertEqual(bound.page_count, 3)
+
+    def test_bound(self):
+        canvas, pdf = self.render(NumberedCanvasFactory(-10, 10).bind(3))
+        self.assertIsInstance(canvas, BoundNumberedCanvas)
+        self.assertIn(b'(1/3)', pdf)
+        self.assertIn(b'(3/3)', pdf)
+
+    def test_bound_offset(self):
+        canvas, pdf = self.render(NumberedCanvasFactory(-10, 10).bind(8, 5))
+        self.assertIn(b'(6/8)', pdf)
+        self.assertIn(b'(8/8)', pdf)
+
+
+class TestCountingCanvas(unittest.TestCase):
+    def setUp(self):
+        self.canvas = CountingCanvas(io.BytesIO())
+
+    def test_page_count(self):
+        for x in range(3):
+            self.canvas.drawString(10, 10, 'page')
+            self.canvas.showPage()
+        self.canvas.save()
+        self.assertEqual(self.canvas.page_count, 3)
+
+    def test_nothing_drawn(self):
+        self.canvas.drawString(10, 10, 'page')
+        self.canvas.rect(10, 10, 100, 100)
+        self.canvas.drawPath(self.canvas.beginPath())
+        self.canvas.drawImage('/does/not/exist.png', 0, 0)
+        self.assertEqual(self.canvas._code, [])
+
+
+class TestBoundStory(unittest.TestCase):
+    def build(self, **kw):
+        story = Story(SimpleTemplate())
+        for x in range(150):
+            story.append(u'Line {0}'.format(x))
+
+        out = io.BytesIO()
+        with mock.patch.object(rl_config, 'pageCompression', 0):
+            story.build(out, u'Title', u'Author', canvasmaker=NumberedCanvasFactory(-10, 10), **kw)
+        return out.getvalue()
+
+    def test_workers(self):
+        pdf = self.build(workers=1)
+        self.assertIn(b'(1/3)', pdf)
+        self.assertIn(b'(3/3)', pdf)
+
+    def test_streaming(self):
+        pdf = self.build(streaming=True)
+        self.assertIn(b'(1/3)', pdf)
+        self.assertIn(b'(3/3)', pdf)
@@ -1,18 +1,31 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import io
+import re
 import mock
 import unittest
 
+from reportlab import rl_config
 from reportlab.platypus import (
     Table,
     FrameBreak,
 )
 from pdf_generator import Paragraph
+from pdf_generator.styles import LazyParagraph
 
 from pdf_generator.pdf_generator import (
     Story,
 )
+from pdf_generator.templates import SimpleTemplate, Template
+from pdf_generator.page_number import NumberedCanvasFactory
+from pdf_generator.merge import _PDF
+
+
+def get_contents(pdf):
+    pdf = _PDF(pdf)
+    return [pdf.objects[int(re.search(br'/Contents (\d+) 0 R', pdf.objects[page]).group(1))]
+            for page in pdf.pages]
 
 
 class TestStory(unittest.TestCase):
@@ -24,6 +37,11 @@ class TestStory(unittest.TestCase):
         self.story.append('String')
         self.assertEqual(list(self.story), [Paragraph('String')])
 
+    def test_append_lazy(self):
+        self.story.append('String', lazy=True)
+        self.assertIsInstance(self.story[0], LazyParagraph)
+        self.assertEqual(list(self.story), [Paragraph('String')])
+
     def test_append(self):
         table = Table([['A']])
         self.story.append(table)
@@ -38,3 +56,227 @@ class TestStory(unittest.TestCase):
         self.template.assert_called_once_with(out, 'title', 'author', False,
                                               header=None, page_end=None, footer=None)
         self.template.return_value.build.assert_called_once_with([p1])
+
+
+class TestStoryCountPages(unittest.TestCase):
+    def setUp(self):
+        self.story = Story(SimpleTemplate())
+        for x in range(150):
+            self.story.append(u'Line {0}'.format(x))
+
+    def test_count_pages(self):
+        self.assertEqual(self.story.count_pages(), 3)
+
+    def test_story_kept(self):
+        self.story.count_pages()
+        self.assertEqual(len(self.story), 150)
+
+    def test_build_after_count(self):
+        self.story.count_pages()
+        self.story.build(io.BytesIO(), u'Title', u'Author')
+
+    def test_page_end_not_called(self):
+        page_end = mock.Mock()
+        story = Story(SimpleTemplate(page_end=page_end, header=Paragraph(u'Header')))
+        story.extend(self.story)
+        self.assertEqual(story.count_pages(), 3)
+        self.assertFalse(page_end.called)
+
+    def test_page_end_not_called_template(self):
+        page_end = mock.Mock()
+        template = Template(page_end=page_end)
+        template.add_whole_page('page')
+        story = Story(template)
+        story.extend(self.story)
+        story.count_pages()
+        self.assertFalse(page_end.called)
+
+    def test_page_end_called_once(self):
+        page_end = mock.Mock()
+        self.story.build(io.BytesIO(), u'Title', u'Author', page_end=page_end,
+                         canvasmaker=NumberedCanvasFactory(-10, 10), streaming=True)
+        self.assertEqual(page_end.call_count, 3)
+
+
+class TestStoryChunks(unittest.TestCase):
+    def setUp(self):
+        self.template = Template()
+        self.template.add_whole_page('first')
+        self.template.add_whole_page('other')
+        self.story = Story(self.template)
+        for x in range(4):
+            for y in range(70):
+                self.story.append(u'Part {0} line {1}'.format(x, y))
+            if x == 1:
+                self.story.next_template('other')
+            self.story.next_page()
+
+    def test_get_chunks(self):
+        chunks = self.story.get_chunks(4)
+        self.assertEqual([(len(flowables), first_template) for template, flowables, first_template in chunks],
+                         [(71, None), (72, None), (71, 'other'), (71, 'other')])
+
+    def test_get_chunks_no_page_break(self):
+        story = Story(self.template)
+        story.append(u'Line')
+        self.assertEqual(story.get_chunks(4), [(self.template, list(story), None)])
+
+    def build(self, **kw):
+        out = io.BytesIO()
+        with mock.patch.object(rl_config, 'pageCompression', 0):
+            self.story.build(out, u'Title', u'Author',
+                             canvasmaker=NumberedCanvasFactory(-10, 10), **kw)
+        return out.getvalue()
+
+    def test_build_workers(self):
+        pdf = self.build(workers=1)
+        self.assertEqual(pdf.count(b'/Type /Page\n'), 8)
+        self.assertEqual(pdf.count(b'/Type /Catalog'), 1)
+        self.assertEqual(pdf.count(b'/Title (Title)'), 1)
+        self.assertIn(b'(1/8)', pdf)
+        self.assertIn(b'(8/8)', pdf)
+
+    def test_build_workers_same_pages(self):
+        pdf = self.build(workers=1)
+        self.assertEqual(len(self.story), 285)
+        self.assertEqual(pdf.count(b'/Type /Page\n'), self.build().count(b'/Type /Page\n'))
+
+
+class TestStoryIncremental(unittest.TestCase):
+    def setUp(self):
+        self.story = self.get_story()
+        self.story.segment_pages = 3
+        self.build()
+        self.segments = list(self.story._segments)
+
+    def get_story(self):
+        story = Story(SimpleTemplate())
+        for x in range(5):
+            for y in range(100):
+                story.append(u'Part {0} line {1}'.format(x, y))
+            story.next_page()
+        return story
+
+    def build(self, story=None, **kw):
+        out = io.BytesIO()
+        with mock.patch.multiple(rl_config, pageCompression=0, invariant=1):
+            (story or self.story).build(out, u'Title', u'Author', page_end=self.page_end,
+                                        incremental=story is None, **kw)
+        return get_contents(out.getvalue())
+
+    def page_end(self, canvas, doc):
+        canvas.drawString(10, 10, u'Page {0}'.format(doc.page))
+
+    def reused(self):
+        return [any(segment is old for old in self.segments) for segment in self.story._segments]
+
+    def test_same_pages(self):
+        self.assertEqual(self.build(), self.build(self.get_story()))
+        self.assertEqual([(len(segment.flowables), segment.page_offset) for segment in self.segments],
+                         [(165, 0), (138, 3), (165, 6), (37, 9)])
+
+    def test_unchanged(self):
+        self.build()
+        self.assertEqual(self.reused(), [True, True, True, True])
+
+    def test_set(self):
+        self.story[250] = Paragraph(u'Edited ' * 40)
+        expected = self.get_story()
+        expected[250] = Paragraph(u'Edited ' * 40)
+
+        self.assertEqual(self.build(), self.build(expected))
+        self.assertEqual(self.reused(), [True, False, True, True])
+
+    def test_set_same(self):
+        self.story[10] = self.story[10]
+        self.build()
+        self.assertEqual(self.reused(), [False, True, True, True])
+
+    def test_insert_delete(self):
+        self.story.insert(130, Paragraph(u'Inserted'))
+        del self.story[20]
+        expected = self.get_story()
+        expected.insert(130, Paragraph(u'Inserted'))
+        del expected[20]
+
+        self.assertEqual(self.build(), self.build(expected))
+        self.assertEqual(self.reused(), [False, False, True, True])
+
+    def test_append(self):
+        self.story.append(u'Appended')
+        self.build()
+        self.assertEqual(self.reused(), [True, True, True, False])
+
+    def test_page_count_changed(self):
+        for x in range(60):
+            self.story.insert(0, Paragraph(u'Inserted'))
+        self.build()
+        self.assertEqual(self.reused(), [False, False, False, False])
+        self.assertEqual([segment.page_offset for segment in self.story._segments], [0, 3, 6, 9])
+
+    def test_options_changed(self):
+        self.build(footer=Paragraph(u'Footer'))
+        self.assertEqual(self.reused(), [False, False, False, False])
+
+    def test_workers(self):
+        self.assertRaises(ValueError, self.build, workers=1)
+
+    def test_numbered(self):
+        self.assertRaises(ValueError, self.build, canvasmaker=NumberedCanvasFactory(-10, 10))
+
+
+class TestStoryStreaming(unittest.TestCase):
+    def setUp(self):
+        self.story = self.get_story()
+
+    def get_story(self):
+        story = Story(SimpleTemplate())
+        story.segment_pages = 2
+        for x in range(300):
+            story.append(u'Line {0}'.format(x))
+        return story
+
+    def build(self, story, **kw):
+        out = io.BytesIO()
+        with mock.patch.multiple(rl_config, pageCompression=0, invariant=1):
+            story.build(out, u'Title', u'Author', page_end=self.page_end, **kw)
+        return out.getvalue()
+
+    def page_end(self, canvas, doc):
+        canvas.drawString(10, 10, u'Page {0}'.format(doc.page))
+
+    def test_same_pages(self):
+        pdf = self.build(self.story, streaming=True)
+        self.assertEqual(get_contents(pdf), get_contents(self.build(self.get_story())))
+
+    def test_story_consumed(self):
+        self.build(self.story, streaming=True)
+        self.assertEqual(len(self.story), 0)
+
+    def test_segments(self):
+        with mock.patch('pdf_generator.pdf_generator.PDFWriter') as PDFWriter:
+            self.build(self.story, streaming=True)
+        self.assertEqual(PDFWriter.return_value.add.call_count, 3)
+        PDFWriter.return_value.close.assert_called_once_with()
+
+    def test_numbered(self):
+        pdf = self.build(self.story, streaming=True, canvasmaker=NumberedCanvasFactory(-10, 10))
+        self.assertIn(b'(1/5)', pdf)
+        self.assertIn(b'(5/5)', pdf)
+
+    def test_internal_link(self):
+        self.story[0] = Paragraph(u'<link href="#target">Link</link>')
+        self.story[10] = Paragraph(u'<a name="target"/>Target')
+        self.assertIn(b'/Dest [', self.build(self.story, streaming=True))
+
+    def test_internal_link_other_segment(self):
+        self.story[0] = Paragraph(u'<link href="#target">Link</link>')
+        self.story[-1] = Paragraph(u'<a name="target"/>Target')
+        self.assertRaises(ValueError, self.build, self.story, streaming=True)
+
+    def test_empty(self):
+        story = Story(SimpleTemplate())
+        self.assertEqual(len(_PDF(self.build(story, streaming=True)).pages), 0)
+
+    def test_incremental(self):
+        self.assertRaises(ValueError, self.build, self.story, streaming=True, incremental=True)
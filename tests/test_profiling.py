@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from reportlab.platypus import Table
+
+from pdf_generator import Story, Paragraph
+from pdf_generator.templates import SimpleTemplate, Template
+from pdf_generator.profiling import BuildProfile, instrument
+from pdf_generator.page_number import NumberedCanvasFactory
+
+
+class TestBuildProfile(unittest.TestCase):
+    def setUp(self):
+        self.template = SimpleTemplate(header=Paragraph(u'Header'))
+        self.story = Story(self.template)
+        for x in range(120):
+            self.story.append(u'Line {0}'.format(x))
+        self.story.append(u'Long paragraph ' * 400)
+        self.story.append(Table([[u'A', u'B']] * 10))
+
+    def build(self, profile, **kw):
+        self.story.build(io.BytesIO(), u'Title', u'Author', profile=profile, **kw)
+        return profile.report()
+
+    def test_flowables(self):
+        report = self.build(BuildProfile())
+        self.assertEqual(sorted(report['flowables']), ['Paragraph', 'Table'])
+        paragraph = report['flowables']['Paragraph']
+        # The lines and the 2 parts of the long paragraph
+        self.assertEqual(paragraph['draw'].count, 122)
+        self.assertGreater(paragraph['wrap'].count, 122)
+        self.assertGreater(paragraph['split'].time, 0)
+        self.assertEqual(report['flowables']['Table']['draw'].count, 2)
+
+    def test_pages(self):
+        report = self.build(BuildProfile())
+        self.assertEqual(len(report['pages']), 4)
+        self.assertEqual(report['header'].count, 4)
+        self.assertEqual(report['footer'].count, 0)
+        self.assertEqual(report['page_end'].count, 0)
+        self.assertEqual(report['show_page'].count, 4)
+        self.assertEqual(report['save'].count, 1)
+        self.assertEqual(report['build'].count, 1)
+        self.assertLess(report['save'].time, report['build'].time)
+
+    def test_page_end(self):
+        report = self.build(BuildProfile(), footer=Paragraph(u'Footer'), page_end=lambda canvas, doc: None)
+        self.assertEqual(report['header'].count, 4)
+        self.assertEqual(report['footer'].count, 4)
+        self.assertEqual(report['page_end'].count, 4)
+
+    def test_numbered_workers(self):
+        report = self.build(BuildProfile(), canvasmaker=NumberedCanvasFactory(-10, 10), workers=1)
+        self.assertEqual(len(report['pages']), 4)
+        self.assertEqual(report['header'].count, 4)
+        self.assertEqual(report['build'].count, 1)
+        self.assertEqual(report['count'].count, 1)
+        self.assertEqual(report['flowables']['Paragraph']['draw'].count, 122)
+
+    def test_template_untouched(self):
+        template = Template()
+        template.add_whole_page('page')
+        story = Story(template)
+        story.append(u'Line')
+        story.build(io.BytesIO(), u'Title', u'Author', profile=BuildProfile())
+
+        for page_template in template.get_page_templates(None, None, None):
+            self.assertFalse(hasattr(page_template.onPageEnd, '__wrapped__'))
+            for frame in page_template.frames:
+                self.assertNotIn('add', frame.__dict__)
+
+    def test_flowables_untouched(self):
+        first = self.story[0]
+        self.build(BuildProfile())
+        self.assertNotIn('wrap', first.__dict__)
+        self.assertNotIn('drawOn', first.__dict__)
+
+    def test_count_pages(self):
+        profile = BuildProfile()
+        with profile:
+            self.story.count_pages()
+        report = profile.report()
+        self.assertEqual(report['count'].count, 1)
+        self.assertEqual(report['build'].count, 0)
+        self.assertEqual(report['pages'], [])
+
+    def test_workers(self):
+        report = self.build(BuildProfile(), workers=1)
+        self.assertEqual(report['build'].count, 1)
+        self.assertEqual(report['flowables']['Paragraph']['draw'].count, 122)
+
+    def test_format(self):
+        profile = BuildProfile()
+        self.build(profile)
+        lines = profile.format().splitlines()
+        self.assertTrue(lines[1].startswith(u'Paragraph'))
+        self.assertTrue(lines[-1].startswith(u'build'))
+
+    def test_instrument_without_profile(self):
+        doc = self.template(io.BytesIO(), u'Title', u'Author')
+        self.assertIs(instrument(doc), doc)
+        self.assertNotIn('build', doc.__dict__)
+
+
+class TestBuildProfileDump(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'build.prof')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_dump_stats(self):
+        profile = BuildProfile(cprofile=True)
+        story = Story(SimpleTemplate())
+        story.append(u'Line')
+        story.build(io.BytesIO(), u'Title', u'Author', profile=profile)
+        profile.dump_stats(self.path)
+
+        stats = pstats.Stats(self.path)
+        self.assertTrue(any(function == 'build' for filename, line, function in stats.stats))
+
+    def test_dump_stats_without_cprofile(self):
+        self.assertRaises(ValueError, BuildProfile().dump_stats, self.path)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import mock
+import shutil
+import tempfile
+import unittest
+
+from reportlab.lib import colors
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfgen.canvas import Canvas
+from pdf_generator import Story, SimpleTemplate
+from pdf_generator.page_number import CountingCanvas
+from PIL import Image as PILImage
+from reportlab import rl_config
+from pdf_generator.styles import Paragraph, LazyParagraph, FragsCache, LayoutCache, Image, get_style, bold
+
+
+class TestParagraphCounted(unittest.TestCase):
+    def setUp(self):
+        self.p = Paragraph(u'Some <b>text</b> ' * 20)
+        self.p.canv = CountingCanvas(io.BytesIO())
+
+    def test_lines_released(self):
+        self.p.wrap(100, 100)
+        self.p.draw()
+        self.assertNotIn('blPara', self.p.__dict__)
+        self.assertNotIn('_wrapWidths', self.p.__dict__)
+
+    def test_split_lines_released(self):
+        self.p.wrap(100, 1000)
+        parts = self.p.split(100, 40)
+        self.assertEqual(len(parts), 2)
+        self.assertNotIn('blPara', self.p.__dict__)
+
+    def test_drawn_after_counted(self):
+        size = self.p.wrap(100, 100)
+        self.p.draw()
+
+        self.assertEqual(self.p.wrap(100, 100), size)
+        self.p.canv = Canvas(io.BytesIO())
+        self.p.draw()
+
+
+class TestGetStyle(unittest.TestCase):
+    def setUp(self):
+        self.parent = ParagraphStyle('parent')
+
+    def test_shared(self):
+        self.assertIs(get_style(self.parent, fontSize=12, textColor=colors.red),
+                      get_style(self.parent, textColor=colors.red, fontSize=12))
+
+    def test_other_attributes(self):
+        self.assertIsNot(get_style(self.parent, fontSize=12), get_style(self.parent, fontSize=13))
+
+    def test_other_parent(self):
+        self.assertIsNot(get_style(self.parent, fontSize=12),
+                         get_style(ParagraphStyle('other'), fontSize=12))
+
+    def test_unhashable(self):
+        style = get_style(self.parent, fontSize=12, unhashable=[])
+        self.assertEqual(style.fontSize, 12)
+        self.assertIsNot(style, get_style(self.parent, fontSize=12, unhashable=[]))
+
+    def test_paragraph(self):
+        self.assertIs(Paragraph(u'a', 'h2', fontSize=12).style, Paragraph(u'b', 'h2', fontSize=12).style)
+
+
+class TestLazyParagraph(unittest.TestCase):
+    def setUp(self):
+        self.p = LazyParagraph(u'Some <b>text</b> ' * 20, 'h2', fontSize=10)
+
+    def test_not_parsed(self):
+        self.assertNotIn('frags', self.p.__dict__)
+        self.assertEqual(self.p.style.fontSize, 10)
+
+    def test_wrap(self):
+        expected = Paragraph(u'Some <b>text</b> ' * 20, 'h2', fontSize=10).wrap(100, 1000)
+        self.assertEqual(self.p.wrap(100, 1000), expected)
+        self.assertIn('frags', self.p.__dict__)
+
+    def test_draw_release(self):
+        self.p.wrap(100, 1000)
+        self.p.drawOn(Canvas(io.BytesIO()), 0, 0)
+        self.assertNotIn('frags', self.p.__dict__)
+        self.assertNotIn('blPara', self.p.__dict__)
+
+    def test_draw_again(self):
+        canvas = Canvas(io.BytesIO())
+        for x in range(2):
+            self.p.wrap(100, 1000)
+            self.p.drawOn(canvas, 0, 0)
+
+    def test_split(self):
+        parts = self.p.split(100, 50)
+        self.assertEqual(len(parts), 2)
+        self.assertTrue(all(isinstance(part.frags, list) for part in parts))
+
+    def test_eq(self):
+        self.assertEqual(self.p, Paragraph(u'Some <b>text</b> ' * 20, 'h2', fontSize=10))
+        self.assertNotIn('frags', self.p.__dict__)
+
+
+class TestFragsCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = FragsCache()
+
+    def test_hit(self):
+        with self.cache:
+            first = bold(u'Total')
+            second = bold(u'Total')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual([f.text for f in first.frags], [f.text for f in second.frags])
+        self.assertEqual(second.frags[0].fontName, 'Helvetica-Bold')
+
+    def test_frags_copied(self):
+        with self.cache:
+            first = bold(u'Total')
+            second = bold(u'Total')
+        self.assertIsNot(first.frags[0], second.frags[0])
+
+    def test_other_style(self):
+        with self.cache:
+            Paragraph(u'Total')
+            Paragraph(u'Total', 'h1')
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_sequence(self):
+        with self.cache:
+            paragraphs = [Paragraph(u'Figure <seq id="frags_cache"/>') for x in range(3)]
+        self.assertEqual(len(self.cache), 0)
+        numbers = [paragraph.getPlainText().split()[1] for paragraph in paragraphs]
+        self.assertEqual([int(number) for number in numbers], [int(numbers[0]) + x for x in range(3)])
+
+    def test_not_used(self):
+        with self.cache:
+            pass
+        Paragraph(u'Total')
+        self.assertEqual(self.cache.misses, 0)
+
+    def test_same_layout(self):
+        text = u'Some <b>bold</b> and <i>italic</i> text ' * 10
+        expected = Paragraph(text).wrap(100, 1000)
+        with self.cache:
+            Paragraph(text)
+            p = Paragraph(text)
+        self.assertEqual(p.wrap(100, 1000), expected)
+
+    def test_story_build(self):
+        story = Story(SimpleTemplate())
+        for x in range(10):
+            story.append(u'<b>Total</b>', lazy=True)
+        story.build(io.BytesIO(), u'Title', u'Author', frags_cache=self.cache)
+        self.assertEqual((self.cache.hits, self.cache.misses), (9, 1))
+
+
+class TestLayoutCache(unittest.TestCase):
+    text = u'Some <b>bold</b> and <i>italic</i> text ' * 20
+
+    def setUp(self):
+        self.cache = LayoutCache()
+
+    def test_hit(self):
+        with self.cache:
+            first = Paragraph(self.text)
+            second = Paragraph(self.text)
+            self.assertEqual(first.wrap(100, 1000), second.wrap(100, 1000))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertIs(first.blPara, second.blPara)
+
+    def test_other_width(self):
+        with self.cache:
+            Paragraph(self.text).wrap(100, 1000)
+            Paragraph(self.text).wrap(200, 1000)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_other_style(self):
+        with self.cache:
+            Paragraph(self.text).wrap(100, 1000)
+            Paragraph(self.text, fontSize=12).wrap(100, 1000)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_lazy_paragraph(self):
+        with self.cache:
+            LazyParagraph(self.text).wrap(100, 1000)
+            LazyParagraph(self.text).wrap(100, 1000)
+            Paragraph(self.text).wrap(100, 1000)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_sequence(self):
+        with self.cache:
+            paragraphs = [Paragraph(u'Figure <seq id="layout_cache"/>') for x in range(3)]
+            for paragraph in paragraphs:
+                paragraph.wrap(100, 1000)
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(len(set(paragraph.blPara.lines[0].words[0].text for paragraph in paragraphs)), 3)
+
+    def test_split_parts(self):
+        with self.cache:
+            first = Paragraph(self.text).split(100, 50)
+            second = Paragraph(self.text).split(100, 50)
+            for part in first + second:
+                part.wrap(100, 1000)
+        self.assertEqual((self.cache.hits, self.cache.misses), (3, 3))
+        self.assertEqual([part.text for part in first], [None, None])
+
+    def test_split_not_shared(self):
+        with self.cache:
+            first = Paragraph(self.text)
+            first.wrap(100, 1000)
+            second = Paragraph(self.text)
+            second.wrap(100, 1000)
+            second.split(100, 50)
+        self.assertIsNot(first.blPara, second.blPara)
+
+    def build(self, **kw):
+        story = Story(SimpleTemplate())
+        for x in range(6):
+            story.append(u'Title {0}'.format(x % 2), 'h2')
+            story.append(self.text * 6)
+        out = io.BytesIO()
+        story.build(out, u'Title', u'Author', **kw)
+        return out.getvalue()
+
+    def test_story_build(self):
+        with mock.patch.object(rl_config, 'invariant', 1):
+            expected = self.build()
+            self.assertEqual(self.build(layout_cache=self.cache), expected)
+            self.assertEqual(self.build(layout_cache=self.cache), expected)
+        self.assertGreater(self.cache.hit_rate, .5)
+
+
+class TestImage(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'image.png')
+        PILImage.new('RGB', (200, 100)).save(self.path)
+
+    def test_size_without_reading(self):
+        image = Image(self.path)
+        self.assertEqual(image.wrap(500, 500), (200, 100))
+        self.assertNotIn('_img', image.__dict__)
+
+    def test_ratio(self):
+        image = Image(self.path, width=50, ratio=2)
+        self.assertEqual(image.wrap(500, 500), (50, 25))
+        self.assertEqual((image.imageWidth, image.imageHeight), (200, 100))
+
+    def test_url(self):
+        # Sized by reportlab when it's laid out
+        image = Image(u'http://example.com/image.png', width=50, height=20)
+        self.assertNotIn('imageWidth', image.__dict__)
+
+    def test_missing_file(self):
+        image = Image(os.path.join(os.path.dirname(self.path), 'missing.png'), width=50, height=20)
+        self.assertNotIn('imageWidth', image.__dict__)
+
+    def test_unreadable_file(self):
+        with mock.patch('pdf_generator.styles.get_image_size', side_effect=IOError):
+            image = Image(self.path)
+        self.assertEqual(image.wrap(500, 500), (200, 100))
+
+    def test_draw(self):
+        story = Story(SimpleTemplate())
+        story.append(Image(self.path, height=20))
+        out = io.BytesIO()
+        story.build(out, u'Title', u'Author')
+        self.assertIn(b'/Subtype /Image', out.getvalue())
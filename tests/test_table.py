@@ -1,16 +1,26 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import io
+import array
 import unittest
 import mock
 
 
+from reportlab import rl_config
 from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import KeepTogether, Table
+from pdf_generator import Story, SimpleTemplate, Paragraph
+from pdf_generator.page_number import NumberedCanvasFactory
 from pdf_generator.table import (
+    TableGenerator,
+    StreamingTable,
     FormattedTableGenerator,
     Styles,
     AllStyles,
     CellsStyle,
+    styles,
 )
 
 
@@ -28,6 +38,165 @@ class TestFormattedTableGenerator(unittest.TestCase):
         self.fpg.append([m1, 4.4])
         self.assertEqual(list(self.fpg), [[m1, '04.40']])
 
+    def test_extend(self):
+        m1, m2 = mock.Mock(), mock.Mock()
+        self.fpg.extend([[m1, 4.4], (m2, 12)])
+        self.assertEqual(list(self.fpg), [[m1, '04.40'], [m2, '12.00']])
+
+    def test_extend_ragged(self):
+        m1, m2 = mock.Mock(), mock.Mock()
+        self.fpg.extend([[m1, 4.4], [m2, 12, 'ignored'], [m1]])
+        self.assertEqual(list(self.fpg), [[m1, '04.40'], [m2, '12.00'], [m1]])
+
+    def test_extend_columns(self):
+        m1, m2 = mock.Mock(), mock.Mock()
+        self.fpg.extend_columns([[m1, m2], array.array('d', [4.4, 12])])
+        self.assertEqual(list(self.fpg), [[m1, '04.40'], [m2, '12.00']])
+
+    def test_extend_columns_mixed_types(self):
+        self.fpg.extend_columns([['a', 'b'], [1, 2.5]])
+        self.assertEqual(list(self.fpg), [['a', '01.00'], ['b', '02.50']])
+
+    def test_extend_columns_tolist(self):
+        column = mock.Mock()
+        column.tolist.return_value = [1, 2]
+        self.fpg.extend_columns([['a', 'b'], column])
+        self.assertEqual(list(self.fpg), [['a', '01.00'], ['b', '02.00']])
+
+
+class TestFreezeColumnWidths(unittest.TestCase):
+    def setUp(self):
+        self.gen = TableGenerator()
+        self.gen.append([u'Name', u'Value'])
+        self.gen.extend([u'Row {0}'.format(x), x] for x in range(99))
+
+    def test_widths(self):
+        expected = self.gen.get_table()
+        expected.wrap(1000, 10000)
+        self.assertEqual(self.gen.freeze_column_widths(), expected._colWidths)
+
+    def test_frozen(self):
+        widths = self.gen.freeze_column_widths()
+        self.assertEqual(self.gen.get_table()._argW, widths)
+        self.assertEqual(self.gen.get_long_table()._argW, widths)
+
+    def test_sample(self):
+        self.gen[55][0] = u'A much longer cell that is not sampled'
+        widths = self.gen.freeze_column_widths(sample=10)
+        self.assertEqual(widths[0], stringWidth(u'Row 90', 'Helvetica', 10) + 12)
+
+    def test_cells(self):
+        gen = TableGenerator()
+        gen.append([u'Two\nlines', Paragraph(u'Paragraph cell')])
+        widths = gen.freeze_column_widths(font_size=8, padding=0)
+        self.assertEqual(widths, [stringWidth(u'lines', 'Helvetica', 8),
+                                  Paragraph(u'Paragraph cell').minWidth()])
+
+
+class TestStreamingTable(unittest.TestCase):
+    def setUp(self):
+        self.consumed = 0
+        self.gen = TableGenerator()
+        self.gen.append([u'Name', u'Value'])
+
+    def rows(self, count):
+        for x in range(count):
+            self.consumed = x + 1
+            yield [u'Row {0}'.format(x), x]
+
+    def build(self, *flowables):
+        story = Story(SimpleTemplate())
+        story.extend(flowables)
+        out = io.BytesIO()
+        with mock.patch.object(rl_config, 'pageCompression', 0):
+            story.build(out, u'Title', u'Author')
+        return out.getvalue()
+
+    def test_get_streaming_table(self):
+        table = self.gen.get_streaming_table(self.rows(10), styles.grid, chunk_size=5, hAlign='RIGHT')
+        self.assertIsInstance(table, StreamingTable)
+        self.assertEqual(table.hAlign, 'RIGHT')
+        self.assertEqual(self.consumed, 0)
+
+    def test_rows(self):
+        pdf = self.build(self.gen.get_streaming_table(self.rows(500), chunk_size=30))
+        self.assertIn(b'(Row 0)', pdf)
+        self.assertIn(b'(Row 499)', pdf)
+        self.assertEqual(pdf.count(b'(Name)'), pdf.count(b'/Type /Page\n'))
+
+    def test_chunks(self):
+        table = self.gen.get_streaming_table(self.rows(500), chunk_size=30)
+        parts = table.split(500, 1000)
+        self.assertEqual(self.consumed, 60)
+        self.assertEqual(parts[0]._nrows, 31)
+        self.assertIs(parts[-1], table)
+
+    def test_column_widths(self):
+        table = self.gen.get_streaming_table(self.rows(500), chunk_size=30)
+        first = table.split(500, 1000)[0]
+        second = table.split(500, 1000)[0]
+        self.assertEqual(first._colWidths, second._colWidths)
+        self.assertEqual(second._nrows, 30)
+
+    def test_empty(self):
+        self.assertIn(b'(Name)', self.build(self.gen.get_streaming_table([])))
+
+    def test_empty_no_header(self):
+        self.build(StreamingTable([]), u'After')
+
+    def split_all(self, table):
+        tables = []
+        while True:
+            parts = table.split(500, 10000)
+            if parts[-1] is not table:
+                return tables + parts
+            tables.extend(parts[:-1])
+
+    def test_header_style(self):
+        table = self.gen.get_streaming_table(self.rows(50), styles.first_row.Background(colors.grey),
+                                             styles.last_row.Background(colors.red), chunk_size=10)
+        tables = self.split_all(table)
+        self.assertEqual(len(tables), 5)
+        self.assertEqual([[command[-1] for command in chunk._bkgrndcmds] for chunk in tables],
+                         [[colors.grey], [], [], [], [colors.red]])
+
+    def test_rows_style_shifted(self):
+        table = self.gen.get_streaming_table(self.rows(20), styles.rows(1, -1).Background(colors.grey),
+                                             chunk_size=10)
+        tables = self.split_all(table)
+        self.assertEqual([chunk._bkgrndcmds[0][1:3] for chunk in tables],
+                         [((0, 1), (-1, -1)), ((0, 0), (-1, -1))])
+
+    def test_laid_out_twice(self):
+        table = self.gen.get_streaming_table(self.rows(10), chunk_size=30)
+        self.build(table)
+        self.assertRaises(ValueError, self.build, table)
+
+    def test_count_pages(self):
+        story = Story(SimpleTemplate())
+        story.append(self.gen.get_streaming_table(self.rows(10)))
+        self.assertRaises(ValueError, story.count_pages)
+        self.assertEqual(self.consumed, 0)
+
+    def test_count_pages_keep_together(self):
+        story = Story(SimpleTemplate())
+        story.append(KeepTogether([Paragraph(u'Title'), self.gen.get_streaming_table(self.rows(10))]))
+        self.assertRaises(ValueError, story.count_pages)
+        self.assertEqual(self.consumed, 0)
+
+    def test_count_pages_cell(self):
+        story = Story(SimpleTemplate())
+        story.append(Table([[u'Cell', [self.gen.get_streaming_table(self.rows(10))]]]))
+        self.assertRaises(ValueError, story.count_pages)
+        self.assertEqual(self.consumed, 0)
+
+    def test_numbered_streaming(self):
+        story = Story(SimpleTemplate())
+        story.append(self.gen.get_streaming_table(self.rows(10)))
+        self.assertRaises(ValueError, story.build, io.BytesIO(), u'Title', u'Author',
+                          canvasmaker=NumberedCanvasFactory(-10, 10), streaming=True)
+        self.assertEqual(self.consumed, 0)
+
 
 class TestAllStyles(unittest.TestCase):
     def setUp(self):
@@ -1,10 +1,13 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import io
 import unittest
 import mock
 
-from pdf_generator import Paragraph
+from reportlab import rl_config
+from pdf_generator import Paragraph, Story, SimpleTemplate
+from pdf_generator.page_number import NumberedCanvasFactory
 from reportlab.platypus import Frame
 from pdf_generator.templates import (
     Fraction,
@@ -115,6 +118,20 @@ class TestBaseTemplatePageEnd(unittest.TestCase):
             canvas, 0, 0
         )
 
+    def test_compiled(self):
+        self.kw['footer'] = mock.Mock(Paragraph)
+        bt = self.bt()
+        page_end = bt.get_page_end()
+        self.assertIs(bt.get_page_end(), page_end)
+        self.assertEqual(page_end.callbacks, (bt._footer, ))
+
+    def test_call_time_callbacks(self):
+        bt = self.bt()
+        page_end = mock.Mock()
+        compiled = bt.get_page_end(page_end)
+        self.assertIsNot(compiled, bt.get_page_end())
+        self.assertEqual(len(compiled.callbacks), 1)
+
 
 class TestTemplateRows(unittest.TestCase):
     def setUp(self):
@@ -287,3 +304,55 @@ class TestTemplate(unittest.TestCase):
             mock.call(40, 30, 140, 260,
                       leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0),
         ])
+
+    def test_page_templates_compiled(self):
+        self.template.add_whole_page('first')
+        page_templates = self.template.get_page_templates()
+        self.assertIs(self.template.get_page_templates(), page_templates)
+        self.assertEqual([pt.id for pt in page_templates], ['first'])
+
+        doc = self.template(mock.Mock(), u'Title', u'Author')
+        self.assertEqual(doc.pageTemplates, page_templates)
+        self.assertIsNot(doc.pageTemplates, page_templates)
+
+    def test_page_templates_add_page(self):
+        self.template.add_whole_page('first')
+        self.template.get_page_templates()
+        self.template.add_whole_page('next')
+        self.assertEqual([pt.id for pt in self.template.get_page_templates()], ['first', 'next'])
+
+    def test_page_templates_call_time_callbacks(self):
+        self.template.add_whole_page('first')
+        page_templates = self.template.get_page_templates(header=mock.Mock(Paragraph))
+        self.assertIsNot(self.template.get_page_templates(), page_templates)
+        self.assertEqual(len(page_templates[0].onPageEnd.callbacks), 1)
+
+
+class TestStaticMargins(unittest.TestCase):
+    def build(self, static_margins, **kw):
+        story = Story(SimpleTemplate(header=Paragraph(u'The header'), footer=Paragraph(u'The footer'),
+                                     static_margins=static_margins))
+        for x in range(150):
+            story.append(u'Line {0}'.format(x))
+
+        out = io.BytesIO()
+        with mock.patch.object(rl_config, 'pageCompression', 0):
+            story.build(out, u'Title', u'Author', **kw)
+        return out.getvalue()
+
+    def test_dynamic(self):
+        pdf = self.build(False)
+        self.assertEqual(pdf.count(b'(The header)'), 3)
+        self.assertEqual(pdf.count(b'(The footer)'), 3)
+
+    def test_static(self):
+        pdf = self.build(True)
+        self.assertEqual(pdf.count(b'(The header)'), 1)
+        self.assertEqual(pdf.count(b'(The footer)'), 1)
+        self.assertEqual(pdf.count(b'/FormXob.pdf_generator-margin-0 Do'), 3)
+        self.assertEqual(pdf.count(b'/FormXob.pdf_generator-margin-1 Do'), 3)
+
+    def test_static_numbered_canvas(self):
+        pdf = self.build(True, canvasmaker=NumberedCanvasFactory(-10, 10, '{0}/{1}'))
+        self.assertEqual(pdf.count(b'(The header)'), 1)
+        self.assertIn(b'(3/3)', pdf)